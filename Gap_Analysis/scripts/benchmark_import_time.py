@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark the import time of the Gap_Analysis package.
+
+Each run starts a fresh interpreter, imports `src` and resolves a set of
+exported names, then reports the median wall time and which heavy optional
+libraries (matplotlib, seaborn, plotly, IPython) ended up in sys.modules.
+With --budget-ms the script exits non-zero when the median exceeds the
+budget, so it can guard against eager imports creeping back in.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent.parent
+HEAVY_MODULES = ["matplotlib", "seaborn", "plotly", "IPython"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import src
+for name in {names!r}:
+    getattr(src, name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000,
+                  "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_once(names):
+    """Import `src` in a fresh interpreter and return (milliseconds, heavy modules loaded)"""
+    code = PROBE.format(names=list(names), heavy=HEAVY_MODULES)
+    completed = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR,
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Import probe failed:\n{completed.stderr.strip()}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result["ms"], result["heavy"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure `import src` time in fresh interpreters")
+    parser.add_argument("--names", nargs="*", default=["compute_gap_score"],
+                        help="Exported names to resolve after the import (default: compute_gap_score)")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh-interpreter runs")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Fail when the median import time exceeds this many milliseconds")
+    args = parser.parse_args()
+
+    print("⏱️  Benchmarking import time of the Gap_Analysis package")
+    print(f"   Names: {', '.join(args.names) or '(none)'} | runs: {args.runs}")
+
+    timings, heavy = [], set()
+    for _ in range(args.runs):
+        try:
+            ms, loaded = measure_once(args.names)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+        timings.append(ms)
+        heavy.update(loaded)
+
+    median = statistics.median(timings)
+    print(f"   Median: {median:.1f} ms (min {min(timings):.1f} ms, max {max(timings):.1f} ms)")
+    if heavy:
+        print(f"   ⚠️  Heavy modules imported: {', '.join(sorted(heavy))}")
+    else:
+        print("   ✅ No heavy modules imported")
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"❌ Median import time {median:.1f} ms exceeds budget of {args.budget_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Generate AdventureWorks-shaped synthetic data for scale testing.
+
+Fits simple empirical models on the shipped AdventureWorks tables (customer
+attribute rows, the long-tail product rank-frequency curve per category,
+orders per customer, daily order volume, order sizes, quantities per
+category, territory shares and stock lead times) and streams statistically
+similar sales, customer, product and territory tables straight to CSV in
+chunks, so 1M, 10M or 100M sales rows can be produced without holding them
+in memory.
+
+Output uses the same file names and columns as data/original, so both the
+gap-analysis notebooks and the recommendation pipeline can be pointed at it.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_DIR = Path(__file__).parent.parent
+DEFAULT_SOURCE_DIR = PROJECT_DIR / "data" / "original"
+DEFAULT_OUTPUT_DIR = PROJECT_DIR / "data" / "synthetic"
+
+SIZE_PRESETS = {"1M": 1_000_000, "10M": 10_000_000, "100M": 100_000_000}
+
+CUSTOMER_FILE = "AdventureWorks Customer Lookup.csv"
+PRODUCT_FILE = "AdventureWorks Product Lookup.csv"
+TERRITORY_FILE = "AdventureWorks Territory Lookup.csv"
+STATIC_FILES = [
+    "AdventureWorks Product Categories Lookup.csv",
+    "AdventureWorks Product Subcategories Lookup.csv",
+    TERRITORY_FILE,
+]
+
+
+def parse_rows(value: str) -> int:
+    """Accept presets (1M, 10M, 100M) or plain integers."""
+    return SIZE_PRESETS.get(value.upper(), None) or int(value)
+
+
+def load_source(source_dir: Path) -> dict:
+    """Load and lightly clean the original AdventureWorks tables."""
+    customers = pd.read_csv(source_dir / CUSTOMER_FILE, encoding="latin-1")
+    customers["CustomerKey"] = pd.to_numeric(customers["CustomerKey"], errors="coerce")
+    customers = customers.dropna(subset=["CustomerKey", "FirstName", "LastName", "AnnualIncome"])
+
+    products = pd.read_csv(source_dir / PRODUCT_FILE)
+    subcategories = pd.read_csv(source_dir / "AdventureWorks Product Subcategories Lookup.csv")
+    products = products.merge(subcategories[["ProductSubcategoryKey", "ProductCategoryKey"]],
+                              on="ProductSubcategoryKey", how="left")
+
+    sales = pd.concat(
+        [pd.read_csv(path) for path in sorted(source_dir.glob("AdventureWorks Sales Data *.csv"))],
+        ignore_index=True,
+    )
+    sales["OrderDate"] = pd.to_datetime(sales["OrderDate"], format="mixed")
+    sales["StockDate"] = pd.to_datetime(sales["StockDate"], format="mixed")
+
+    return {"customers": customers, "products": products, "sales": sales}
+
+
+def fit_model(source: dict) -> dict:
+    """
+    Extract the empirical distributions the generator samples from.
+
+    Returns:
+        Dictionary of probability vectors and value arrays
+    """
+    sales, products, customers = source["sales"], source["products"], source["customers"]
+
+    category_of = products.set_index("ProductKey")["ProductCategoryKey"]
+    sales = sales.assign(Category=sales["ProductKey"].map(category_of))
+
+    # Long-tail popularity per category: rank-frequency of sold products plus the
+    # category's share of sales lines and of its catalog that sells at all
+    popularity = {}
+    for category, group in sales.groupby("Category"):
+        counts = group["ProductKey"].value_counts().to_numpy(dtype=float)
+        popularity[category] = {
+            "curve": counts / counts.sum(),
+            "line_share": len(group) / len(sales),
+            "sold_share": len(counts) / (category_of == category).sum(),
+        }
+
+    orders_per_customer = sales.groupby("CustomerKey")["OrderNumber"].nunique().to_numpy()
+
+    daily_orders = sales.groupby(sales["OrderDate"].dt.normalize()).size()
+    order_sizes = sales.groupby("OrderNumber").size().value_counts(normalize=True).sort_index()
+    lead_days = (sales["OrderDate"] - sales["StockDate"]).dt.days.clip(lower=0).to_numpy()
+    territory_share = sales["TerritoryKey"].value_counts(normalize=True).sort_index()
+
+    quantity_pmf = {
+        category: group["OrderQuantity"].value_counts(normalize=True).sort_index()
+        for category, group in sales.groupby("Category")
+    }
+
+    return {
+        "popularity": popularity,
+        "orders_per_customer": orders_per_customer,
+        "order_dates": daily_orders.index.to_numpy(),
+        "order_date_p": (daily_orders / daily_orders.sum()).to_numpy(),
+        "order_sizes": order_sizes.index.to_numpy(),
+        "order_size_p": order_sizes.to_numpy(),
+        "lead_days": lead_days,
+        "territories": territory_share.index.to_numpy(),
+        "territory_p": territory_share.to_numpy(),
+        "quantity_pmf": quantity_pmf,
+        "customer_rows": customers.reset_index(drop=True),
+    }
+
+
+def long_tail_weights(curve: np.ndarray, n_items: int, rng: np.random.Generator) -> np.ndarray:
+    """Stretch the source rank-frequency curve to `n_items`, interpolating in log space."""
+    source_rank = np.linspace(0.0, 1.0, len(curve))
+    target_rank = np.linspace(0.0, 1.0, n_items)
+    weights = np.exp(np.interp(target_rank, source_rank, np.log(curve)))
+    rng.shuffle(weights)  # popularity is not tied to key order
+    return weights / weights.sum()
+
+
+def write_products(model: dict, source: dict, output_dir: Path, n_products: int,
+                   rng: np.random.Generator) -> pd.DataFrame:
+    """Clone the catalog into `n_products` variants with perturbed prices."""
+    base = source["products"]
+    picks = rng.integers(0, len(base), size=n_products)
+    picks[:len(base)] = np.arange(min(len(base), n_products))
+    products = base.iloc[picks].reset_index(drop=True)
+
+    variant = np.arange(n_products) // len(base)
+    products["ProductKey"] = np.arange(1, n_products + 1)
+    products["ProductSKU"] = products["ProductSKU"] + np.where(variant > 0, "-V" + variant.astype(str), "")
+    products["ProductName"] = products["ProductName"] + np.where(variant > 0, " v" + variant.astype(str), "")
+    price_factor = np.where(variant > 0, rng.lognormal(0.0, 0.1, n_products), 1.0)
+    products["ProductCost"] = (products["ProductCost"] * price_factor).round(4)
+    products["ProductPrice"] = (products["ProductPrice"] * price_factor).round(4)
+
+    products.drop(columns=["ProductCategoryKey"]).to_csv(output_dir / PRODUCT_FILE, index=False)
+
+    # Like the source, only part of each category ever sells; the rest gets no demand
+    weights = np.zeros(n_products)
+    for category, fitted in model["popularity"].items():
+        members = np.flatnonzero(products["ProductCategoryKey"].to_numpy() == category)
+        if len(members) == 0:
+            continue
+        n_sold = max(1, int(round(len(members) * fitted["sold_share"])))
+        sold = rng.choice(members, size=n_sold, replace=False)
+        weights[sold] = long_tail_weights(fitted["curve"], n_sold, rng) * fitted["line_share"]
+    products["Weight"] = weights / weights.sum()
+    return products[["ProductKey", "ProductCategoryKey", "Weight"]]
+
+
+def write_customers(model: dict, output_dir: Path, n_customers: int, chunk_size: int,
+                    rng: np.random.Generator) -> None:
+    """Resample whole customer rows (keeps the joint attribute distribution) with new identities."""
+    base = model["customer_rows"]
+    first_names = base["FirstName"].to_numpy()
+    last_names = base["LastName"].to_numpy()
+    birth_dates = pd.to_datetime(base["BirthDate"], errors="coerce")
+    path = output_dir / CUSTOMER_FILE
+
+    for start in range(0, n_customers, chunk_size):
+        size = min(chunk_size, n_customers - start)
+        chunk = base.iloc[rng.integers(0, len(base), size=size)].reset_index(drop=True)
+        chunk["CustomerKey"] = np.arange(start, start + size) + 11000
+        chunk["FirstName"] = first_names[rng.integers(0, len(first_names), size=size)]
+        chunk["LastName"] = last_names[rng.integers(0, len(last_names), size=size)]
+        jitter = pd.to_timedelta(rng.integers(-180, 181, size=size), unit="D")
+        chunk["BirthDate"] = (birth_dates.iloc[rng.integers(0, len(base), size=size)].to_numpy()
+                              + jitter).strftime("%Y-%m-%d")
+        chunk["EmailAddress"] = (chunk["FirstName"].str.lower() + chunk["CustomerKey"].astype(str)
+                                 + "@adventure-works.com")
+        chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+
+def write_sales(model: dict, products: pd.DataFrame, output_dir: Path, n_rows: int,
+                order_counts: np.ndarray, chunk_size: int, rng: np.random.Generator) -> dict:
+    """
+    Stream sales rows to one CSV per order year.
+
+    Rows are generated order by order: each order gets a customer (by
+    activity), a date (by daily volume), a size (by order-size distribution)
+    and line items (by product popularity, quantity by category).
+
+    Returns:
+        Row counts written per year
+    """
+    # Every customer places exactly their sampled number of orders, in random order
+    n_customers = len(order_counts)
+    order_queue = rng.permutation(np.repeat(np.arange(n_customers, dtype=np.int64), order_counts))
+    queue_position = 0
+    home_territory = rng.choice(model["territories"], size=n_customers, p=model["territory_p"])
+    product_cdf = np.cumsum(products["Weight"].to_numpy())
+    product_keys = products["ProductKey"].to_numpy()
+    product_category = products["ProductCategoryKey"].to_numpy()
+
+    written = {}
+    order_counter = 1
+    remaining = n_rows
+    while remaining > 0:
+        target = min(chunk_size, remaining)
+        sizes = rng.choice(model["order_sizes"], p=model["order_size_p"],
+                           size=int(target / np.dot(model["order_sizes"], model["order_size_p"])) + 1)
+        sizes = sizes[np.cumsum(sizes) <= target]
+        if sizes.sum() < target:
+            sizes = np.append(sizes, target - sizes.sum())
+        n_orders, n_lines = len(sizes), int(sizes.sum())
+
+        order_customer = order_queue[queue_position:queue_position + n_orders]
+        if len(order_customer) < n_orders:  # queue exhausted by sampling noise
+            extra = rng.choice(n_customers, size=n_orders - len(order_customer), p=order_counts / order_counts.sum())
+            order_customer = np.concatenate([order_customer, extra])
+        queue_position += n_orders
+        order_date = rng.choice(model["order_dates"], size=n_orders, p=model["order_date_p"])
+
+        order_index = np.repeat(np.arange(n_orders), sizes)
+        line_item = np.arange(n_lines) - np.repeat(np.cumsum(sizes) - sizes, sizes) + 1
+        product_index = np.minimum(np.searchsorted(product_cdf, rng.random(n_lines)), len(product_keys) - 1)
+
+        quantity = np.ones(n_lines, dtype=np.int64)
+        line_category = product_category[product_index]
+        for category, pmf in model["quantity_pmf"].items():
+            mask = line_category == category
+            quantity[mask] = rng.choice(pmf.index.to_numpy(), size=mask.sum(), p=pmf.to_numpy())
+
+        dates = pd.DatetimeIndex(order_date[order_index])
+        lead = pd.to_timedelta(rng.choice(model["lead_days"], size=n_lines), unit="D")
+        chunk = pd.DataFrame({
+            "OrderDate": dates.strftime("%Y-%m-%d"),
+            "StockDate": (dates - lead).strftime("%Y-%m-%d"),
+            "OrderNumber": "SO" + (order_index + order_counter).astype(str),
+            "ProductKey": product_keys[product_index],
+            "CustomerKey": order_customer[order_index] + 11000,
+            "TerritoryKey": home_territory[order_customer][order_index],
+            "OrderLineItem": line_item,
+            "OrderQuantity": quantity,
+        })
+
+        for year, rows in chunk.groupby(dates.year):
+            path = output_dir / f"AdventureWorks Sales Data {year}.csv"
+            rows.to_csv(path, mode="a" if year in written else "w", header=year not in written, index=False)
+            written[year] = written.get(year, 0) + len(rows)
+
+        order_counter += n_orders
+        remaining -= n_lines
+        print(f"  {n_rows - remaining:>12,} / {n_rows:,} sales rows written")
+
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", default="1M", help="Sales rows: 1M, 10M, 100M or an integer")
+    parser.add_argument("--source", type=Path, default=DEFAULT_SOURCE_DIR, help="Original AdventureWorks CSVs")
+    parser.add_argument("--output", type=Path, default=None, help="Output directory (default: data/synthetic/<rows>)")
+    parser.add_argument("--products", type=int, default=None,
+                        help="Catalog size (default: grows with the square root of the scale factor)")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000, help="Rows generated per chunk")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    n_rows = parse_rows(args.rows)
+    output_dir = args.output or DEFAULT_OUTPUT_DIR / args.rows
+    if not args.source.exists():
+        print(f"❌ Source directory not found: {args.source}")
+        sys.exit(1)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(args.seed)
+
+    start = time.perf_counter()
+    print(f"🔍 Fitting distributions from: {args.source}")
+    source = load_source(args.source)
+    model = fit_model(source)
+
+    scale = n_rows / len(source["sales"])
+    mean_order_size = np.dot(model["order_sizes"], model["order_size_p"])
+    n_customers = max(1, int(n_rows / mean_order_size / model["orders_per_customer"].mean()))
+    order_counts = rng.choice(model["orders_per_customer"], size=n_customers)
+    n_products = args.products or max(len(source["products"]), int(len(source["products"]) * np.sqrt(scale)))
+    print(f"📐 Target: {n_rows:,} sales rows, {n_customers:,} customers, {n_products:,} products")
+
+    for name in STATIC_FILES:
+        pd.read_csv(args.source / name).to_csv(output_dir / name, index=False)
+
+    products = write_products(model, source, output_dir, n_products, rng)
+    write_customers(model, output_dir, n_customers, args.chunk_size, rng)
+    written = write_sales(model, products, output_dir, n_rows, order_counts, args.chunk_size, rng)
+
+    print("\n" + "=" * 60)
+    for year, rows in sorted(written.items()):
+        print(f"  {year}: {rows:,} rows")
+    print(f"✨ Synthetic data written to {output_dir} in {time.perf_counter() - start:.1f}s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,86 @@
 __version__ = "1.0.0"
 __author__ = "Hamza"
 
-# Data processing modules
-from .data.loader import load_excel_sheets, summarize_excel_sheets
-from .data.quality import print_missing_data, plot_missing_heatmaps, plot_missing_summary_bar
-from .data.statistics import analyze_numerical_statistics, analyze_categorical_distributions
-from .data.preview import preview_all_datasets, check_duplicates
-from .data.relationships import explore_structure, infer_relationships
+# Submodules are imported lazily on first attribute access (PEP 562), so
+# `from src import compute_gap_score` does not pull in matplotlib, seaborn,
+# plotly or IPython. See scripts/benchmark_import_time.py.
+import importlib
 
-# Analysis modules
-from .analysis.supply_demand import (compute_category_supply, compute_category_demand, merge_supply_demand,
-                            compute_subcategory_supply, compute_subcategory_demand,
-                            compute_territory_demand, compute_subcategory_territory_demand)
-from .analysis.gap_score import (compute_gap_score, normalize_gap_score, classify_gap_level, 
-                        compute_demand_supply_ratio, rank_categories_by_gap)
+_SUBMODULE_EXPORTS = {
+    # Data processing modules
+    ".data.loader": ("load_excel_sheets", "summarize_excel_sheets"),
+    ".data.quality": ("print_missing_data", "plot_missing_heatmaps", "plot_missing_summary_bar"),
+    ".data.statistics": ("analyze_numerical_statistics", "analyze_categorical_distributions"),
+    ".data.preview": ("preview_all_datasets", "check_duplicates"),
+    ".data.relationships": ("explore_structure", "infer_relationships"),
 
-# Visualization modules - Static
-from .visualization.static.gap_visualizer import (plot_gap_score_bar, plot_supply_vs_demand, 
-                             plot_gap_dashboard, plot_gap_heatmap,
-                             plot_subcategory_gap_heatmap, plot_territory_gap_analysis,
-                             plot_gap_by_region_category, plot_top_gaps_summary)
+    # Analysis modules
+    ".analysis.supply_demand": ("compute_category_supply", "compute_category_demand", "merge_supply_demand",
+                                "compute_subcategory_supply", "compute_subcategory_demand",
+                                "compute_territory_demand", "compute_subcategory_territory_demand",
+                                "compute_demand_cube"),
+    ".analysis.gap_score": ("compute_gap_score", "normalize_gap_score", "classify_gap_level",
+                            "compute_demand_supply_ratio", "rank_categories_by_gap", "score_gap_segments"),
+    ".analysis.aggregate_store": ("AggregateStore",),
+    ".analysis.gap_trends": ("compute_gap_trends",),
 
-# Visualization modules - Dashboards
-from .visualization.dashboards.gap_builder import prepare_gap_summary, export_gap_summary, get_kpi_metrics
+    # Visualization modules - Static
+    ".visualization.static.gap_visualizer": ("plot_gap_score_bar", "plot_supply_vs_demand",
+                                             "plot_gap_dashboard", "plot_gap_heatmap",
+                                             "plot_subcategory_gap_heatmap", "plot_territory_gap_analysis",
+                                             "plot_gap_by_region_category", "plot_top_gaps_summary"),
 
-# Visualization modules - Plotly
-from .visualization.plotly.gap_charts import (
-    create_supply_demand_bar_chart,
-    create_gap_score_bar_chart,
-    create_gap_heatmap,
-    create_category_ranking_chart,
-    create_gap_distribution_pie,
-)
-from .visualization.plotly.dashboard import (
-    create_kpi_card,
-    create_dashboard_kpi_section,
-    export_chart_png,
-    export_chart_html,
-)
+    # Visualization modules - Dashboards
+    ".visualization.dashboards.gap_builder": ("prepare_gap_summary", "export_gap_summary", "get_kpi_metrics"),
 
-# Monitoring modules
-from .monitoring.engine import (
-    MonitoringSnapshot,
-    GapChangeAnalyzer,
-    compute_kpis
-)
-from .monitoring.action_planner import ActionPlanner
-from .monitoring.visualizations import (
-    create_monitoring_kpi_cards,
-    create_gap_trend_chart,
-    create_alert_table,
-    create_change_heatmap,
-    create_supply_demand_balance_chart
-)
+    # Visualization modules - Plotly
+    ".visualization.plotly.gap_charts": (
+        "create_supply_demand_bar_chart",
+        "create_gap_score_bar_chart",
+        "create_gap_heatmap",
+        "create_category_ranking_chart",
+        "create_gap_distribution_pie",
+    ),
+    ".visualization.plotly.dashboard": (
+        "create_kpi_card",
+        "create_dashboard_kpi_section",
+        "export_chart_png",
+        "export_chart_html",
+    ),
+
+    # Monitoring modules
+    ".monitoring.engine": (
+        "MonitoringSnapshot",
+        "GapChangeAnalyzer",
+        "compute_kpis",
+    ),
+    ".monitoring.action_planner": ("ActionPlanner",),
+    ".monitoring.visualizations": (
+        "create_monitoring_kpi_cards",
+        "create_gap_trend_chart",
+        "create_alert_table",
+        "create_change_heatmap",
+        "create_supply_demand_balance_chart",
+    ),
+
+    # API modules
+    ".api.gap_store": ("GapStore",),
+}
+
+_EXPORT_MODULES = {name: module for module, names in _SUBMODULE_EXPORTS.items() for name in names}
+
+
+def __getattr__(name):
+    module_name = _EXPORT_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # cache so later lookups bypass __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
 
 __all__ = [
@@ -73,12 +101,16 @@ __all__ = [
     "compute_subcategory_demand",
     "compute_territory_demand",
     "compute_subcategory_territory_demand",
+    "compute_demand_cube",
     "merge_supply_demand",
     "compute_gap_score",
     "normalize_gap_score",
     "classify_gap_level",
     "compute_demand_supply_ratio",
     "rank_categories_by_gap",
+    "score_gap_segments",
+    "AggregateStore",
+    "compute_gap_trends",
     "plot_gap_score_bar",
     "plot_supply_vs_demand",
     "plot_gap_dashboard",
@@ -108,4 +140,5 @@ __all__ = [
     "create_alert_table",
     "create_change_heatmap",
     "create_supply_demand_balance_chart",
+    "GapStore",
 ]
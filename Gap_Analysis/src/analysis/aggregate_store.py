@@ -0,0 +1,232 @@
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .supply_demand import DEMAND_LEVELS, DEMAND_METRICS, TERRITORY_COLUMNS, _attach_territory_codes
+
+STORE_DIMS = ['Region', 'Country', 'CategoryName', 'SubcategoryName']
+DISTINCT_COLUMNS = {'UniqueOrders': 'OrderNumber', 'UniqueCustomers': 'CustomerKey'}
+
+
+class ExactDistinct:
+    """Exact distinct-count state: the ids (assigned by the store's value dictionary) seen in the cell.
+
+    Ids are kept as a sorted uint32 array, so a cell costs memory proportional to its
+    own distinct values rather than to the store-wide id range. Added batches are
+    buffered and only folded into the sorted array when counted or merged, or once
+    the buffer outgrows it, so ingest stays proportional to the batch.
+    """
+
+    def __init__(self):
+        self._ids = np.empty(0, dtype=np.uint32)
+        self._pending: List[np.ndarray] = []
+        self._pending_size = 0
+
+    def _compact(self) -> None:
+        if self._pending:
+            self._ids = np.unique(np.concatenate([self._ids] + self._pending))
+            self._pending, self._pending_size = [], 0
+
+    @property
+    def ids(self) -> np.ndarray:
+        self._compact()
+        return self._ids
+
+    def add(self, ids: np.ndarray) -> None:
+        if len(ids) == 0:
+            return
+        self._pending.append(ids.astype(np.uint32))
+        self._pending_size += len(ids)
+        # The threshold grows with the set, so compaction stays amortized O(batch)
+        if self._pending_size > max(len(self._ids), 1 << 16):
+            self._compact()
+
+    def merge(self, *others: 'ExactDistinct') -> 'ExactDistinct':
+        merged = ExactDistinct()
+        parts = [part for sketch in (self,) + others for part in [sketch._ids] + sketch._pending]
+        merged._ids = np.unique(np.concatenate(parts))
+        return merged
+
+    def count(self) -> int:
+        return len(self.ids)
+
+
+class HyperLogLog:
+    """Approximate distinct-count state (HyperLogLog, ~1.04 / sqrt(2**precision) relative error)."""
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        remainder = hashes & np.uint64((1 << (64 - p)) - 1)
+        # Bit length via frexp, split in 30-bit halves so every value converts to float exactly
+        high, low = remainder >> np.uint64(30), remainder & np.uint64((1 << 30) - 1)
+        bit_length = np.where(high > 0, np.frexp(high.astype(np.float64))[1] + 30,
+                              np.frexp(low.astype(np.float64))[1])
+        rank = ((64 - p) - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, *others: 'HyperLogLog') -> 'HyperLogLog':
+        if any(other.precision != self.precision for other in others):
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum.reduce([self.registers] + [other.registers for other in others])
+        return merged
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+
+class AggregateStore:
+    """
+    Persistent supply/demand aggregates per dimension key, updated incrementally.
+
+    The store keeps one cell per (Region, Country, CategoryName, SubcategoryName)
+    key holding TotalQuantitySold and mergeable distinct-count state for orders
+    and customers. New sales batches are folded in with work proportional to the
+    batch, and any rollup in DEMAND_LEVELS (or any subset of the dimensions) is
+    answered by merging cell states, without touching raw sales rows.
+    """
+
+    def __init__(self, distinct: str = 'exact', hll_precision: int = 14,
+                 dims: Optional[List[str]] = None):
+        """
+        Args:
+            distinct: 'exact' (sorted id sets, exact counts) or 'hll' (HyperLogLog, approximate, fixed size)
+            hll_precision: HyperLogLog register bits when distinct='hll'
+            dims: Dimension columns of a cell (default: Region, Country, CategoryName, SubcategoryName)
+        """
+        if distinct not in ('exact', 'hll'):
+            raise ValueError("distinct must be 'exact' or 'hll'")
+        self.distinct = distinct
+        self.hll_precision = hll_precision
+        self.dims = list(dims or STORE_DIMS)
+        self.quantity: Dict[tuple, int] = {}
+        self.sketches: Dict[tuple, Dict[str, Union[ExactDistinct, HyperLogLog]]] = {}
+        self.value_ids: Dict[str, dict] = {column: {} for column in DISTINCT_COLUMNS.values()}
+        self.rows_ingested = 0
+        self.batches_ingested = 0
+        self.watermark = None
+
+    def _new_sketch(self):
+        return ExactDistinct() if self.distinct == 'exact' else HyperLogLog(self.hll_precision)
+
+    def _encode(self, column: str, values: pd.Series) -> np.ndarray:
+        """Ids (exact) or 64-bit hashes (hll) for a distinct column; missing values map to -1 / are masked later."""
+        if self.distinct == 'hll':
+            return pd.util.hash_array(values.to_numpy())
+        codes, uniques = pd.factorize(values)
+        ids = self.value_ids[column]
+        mapped = np.fromiter((ids.setdefault(value, len(ids)) for value in uniques),
+                             dtype=np.int64, count=len(uniques))
+        return np.where(codes >= 0, mapped[codes] if len(mapped) else -1, -1)
+
+    def ingest(self, sales_batch: pd.DataFrame, territory_lookup: Optional[pd.DataFrame] = None) -> 'AggregateStore':
+        """
+        Fold a batch of sales rows into the store.
+
+        Args:
+            sales_batch: New sales rows with CategoryName/SubcategoryName, OrderNumber,
+                OrderQuantity, CustomerKey and TerritoryKey
+            territory_lookup: Territory lookup, required when the store has Region/Country dims
+
+        Returns:
+            The store, for chaining
+        """
+        batch = sales_batch
+        if set(self.dims) & set(TERRITORY_COLUMNS):
+            if territory_lookup is None:
+                raise ValueError("territory_lookup is required for Region/Country dims")
+            batch = sales_batch.assign(**_attach_territory_codes(sales_batch, territory_lookup))
+
+        quantity = batch['OrderQuantity'].to_numpy()
+        encoded = {metric: (self._encode(column, batch[column]), batch[column].notna().to_numpy())
+                   for metric, column in DISTINCT_COLUMNS.items()}
+
+        grouped = batch.groupby(self.dims, dropna=False, sort=False)
+        for key, rows in grouped.indices.items():
+            key = key if isinstance(key, tuple) else (key,)
+            key = tuple(None if pd.isna(value) else value for value in key)
+            self.quantity[key] = self.quantity.get(key, 0) + int(quantity[rows].sum())
+            sketches = self.sketches.setdefault(key, {metric: self._new_sketch() for metric in DISTINCT_COLUMNS})
+            for metric, (values, present) in encoded.items():
+                sketches[metric].add(values[rows][present[rows]])  # nunique ignores missing values
+
+        self.rows_ingested += len(sales_batch)
+        self.batches_ingested += 1
+        if 'OrderDate' in sales_batch.columns and len(sales_batch):
+            latest = pd.to_datetime(sales_batch['OrderDate']).max()
+            self.watermark = latest if self.watermark is None else max(self.watermark, latest)
+        return self
+
+    def rollup(self, level: Union[str, Iterable[str]]) -> pd.DataFrame:
+        """
+        Demand metrics for a rollup level.
+
+        Args:
+            level: A DEMAND_LEVELS name (e.g. 'category', 'territory') or a list of dimension columns
+
+        Returns:
+            DataFrame with the level's dimension columns followed by UniqueOrders,
+            TotalQuantitySold and UniqueCustomers, sorted like `groupby`
+        """
+        level_dims = DEMAND_LEVELS[level] if isinstance(level, str) else list(level)
+        missing = [dim for dim in level_dims if dim not in self.dims]
+        if missing:
+            raise ValueError(f"Dimensions not tracked by this store: {missing}")
+        positions = [self.dims.index(dim) for dim in level_dims]
+
+        groups: Dict[tuple, list] = {}
+        for key in self.quantity:
+            group = tuple(key[i] for i in positions)
+            if None not in group:  # groupby drops missing keys
+                groups.setdefault(group, []).append(key)
+
+        records = []
+        for group, keys in groups.items():
+            record = dict(zip(level_dims, group))
+            counts = {}
+            for metric in DISTINCT_COLUMNS:
+                first, *rest = [self.sketches[key][metric] for key in keys]
+                counts[metric] = first.merge(*rest).count()
+            record['UniqueOrders'] = counts['UniqueOrders']
+            record['TotalQuantitySold'] = sum(self.quantity[key] for key in keys)
+            record['UniqueCustomers'] = counts['UniqueCustomers']
+            records.append(record)
+
+        result = pd.DataFrame(records, columns=level_dims + DEMAND_METRICS)
+        return result.sort_values(level_dims).reset_index(drop=True)
+
+    def save(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'AggregateStore':
+        with open(path, 'rb') as f:
+            store = pickle.load(f)
+        if not isinstance(store, cls):
+            raise TypeError(f"{path} does not contain an {cls.__name__}")
+        return store
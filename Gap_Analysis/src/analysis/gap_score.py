@@ -1,6 +1,12 @@
+from typing import Sequence
+
 import pandas as pd
 import numpy as np
 
+# Upper bounds (exclusive) of every gap level but the last, and the level names
+GAP_LEVEL_THRESHOLDS = (50, 100, 200)
+GAP_LEVEL_LABELS = ('Low Gap', 'Moderate Gap', 'High Gap', 'Critical Gap')
+
 
 def compute_gap_score(df: pd.DataFrame, demand_col: str = 'TotalQuantitySold', 
                      supply_col: str = 'UniqueProducts') -> pd.DataFrame:
@@ -30,21 +36,13 @@ def normalize_gap_score(df: pd.DataFrame, gap_col: str = 'GapScore') -> pd.DataF
     return df
 
 
-def classify_gap_level(df: pd.DataFrame, gap_col: str = 'GapScore') -> pd.DataFrame:
+def classify_gap_level(df: pd.DataFrame, gap_col: str = 'GapScore',
+                       thresholds: Sequence[float] = GAP_LEVEL_THRESHOLDS,
+                       labels: Sequence[str] = GAP_LEVEL_LABELS) -> pd.DataFrame:
     """Classify gaps into severity levels based on score thresholds."""
     df = df.copy()
-    
-    def classify(score):
-        if score < 50:
-            return 'Low Gap'
-        elif score < 100:
-            return 'Moderate Gap'
-        elif score < 200:
-            return 'High Gap'
-        else:
-            return 'Critical Gap'
-    
-    df['GapLevel'] = df[gap_col].apply(classify)
+    score = df[gap_col].to_numpy(dtype=float)
+    df['GapLevel'] = np.select([score < threshold for threshold in thresholds], labels[:-1], default=labels[-1])
     return df
 
 
@@ -66,3 +64,59 @@ def rank_categories_by_gap(df: pd.DataFrame, gap_col: str = 'GapScore',
     df = df.sort_values(by=gap_col, ascending=ascending)
     df['Rank'] = range(1, len(df) + 1)
     return df
+
+
+def score_gap_segments(df: pd.DataFrame, demand_col: str = 'TotalQuantitySold',
+                       supply_col: str = 'UniqueProducts',
+                       thresholds: Sequence[float] = GAP_LEVEL_THRESHOLDS,
+                       labels: Sequence[str] = GAP_LEVEL_LABELS,
+                       ascending: bool = False, inplace: bool = True) -> pd.DataFrame:
+    """
+    Score, normalize, classify and rank gap segments in one vectorized pass.
+
+    Args:
+        df: Segment table with demand and supply columns (any grain, e.g. SKU x territory x week)
+        demand_col: Demand column
+        supply_col: Supply column
+        thresholds: Upper bounds (exclusive) of every gap level but the last
+        labels: Gap level names, one more than `thresholds`
+        ascending: Rank the smallest gap first instead of the largest
+        inplace: Add the columns to `df` itself instead of a copy
+
+    Returns:
+        The frame with GapScore, NormalizedGapScore, GapLevel (an ordered
+        categorical) and Rank added; rows keep their order
+
+    Produces the same values as compute_gap_score, normalize_gap_score,
+    classify_gap_level and rank_categories_by_gap chained together, without
+    copying or sorting the frame.
+    """
+    if len(labels) != len(thresholds) + 1:
+        raise ValueError("labels must have exactly one more entry than thresholds")
+    if not inplace:
+        df = df.copy()
+
+    demand = df[demand_col].to_numpy(dtype=float)
+    supply = df[supply_col].to_numpy(dtype=float)
+    score = np.round((demand + 1) / (supply + 1), 2)
+
+    normalized = np.zeros_like(score)
+    if np.isfinite(score).any():
+        low, high = np.nanmin(score), np.nanmax(score)
+        if high - low > 0:
+            normalized = np.round((score - low) / (high - low), 4)
+
+    # searchsorted(side='right') puts a score equal to a threshold in the next level, like `score < threshold`
+    level_codes = np.searchsorted(np.asarray(thresholds, dtype=float), score, side='right')
+    level_codes[np.isnan(score)] = len(thresholds)
+
+    # Same sort as rank_categories_by_gap (sort_values' default kind, NaN last), so tied scores get the same ranks
+    order = pd.Series(score).sort_values(ascending=ascending).index.to_numpy()
+    rank = np.empty(len(score), dtype=np.int64)
+    rank[order] = np.arange(1, len(score) + 1)
+
+    df['GapScore'] = score
+    df['NormalizedGapScore'] = normalized
+    df['GapLevel'] = pd.Categorical.from_codes(level_codes, categories=list(labels), ordered=True)
+    df['Rank'] = rank
+    return df
@@ -0,0 +1,118 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .supply_demand import TERRITORY_COLUMNS, _attach_territory_codes
+
+# Time bucket name -> (pandas period frequency, output column)
+TIME_BUCKETS = {
+    'day': ('D', 'Day'),
+    'week': ('W', 'Week'),
+    'month': ('M', 'Month'),
+}
+
+PRODUCT_DIMS = ['CategoryName', 'SubcategoryName']
+
+
+def _order_dates(sales_data: pd.DataFrame) -> pd.Series:
+    """OrderDate as a datetime Series, from the column or from an OrderDate index."""
+    if 'OrderDate' in sales_data.columns:
+        return pd.to_datetime(sales_data['OrderDate'])
+    if isinstance(sales_data.index, pd.DatetimeIndex):
+        return pd.Series(sales_data.index, index=sales_data.index)
+    raise ValueError("sales_data needs an OrderDate column or a DatetimeIndex")
+
+
+def _supply_per_group(products_full: pd.DataFrame, dims: List[str], group_values: pd.DataFrame) -> np.ndarray:
+    """Unique products for each group, from the product dims among `dims` (whole catalog when there are none)."""
+    product_dims = [dim for dim in dims if dim in PRODUCT_DIMS]
+    if not product_dims:
+        return np.full(len(group_values), products_full['ProductKey'].nunique())
+    supply = products_full.groupby(product_dims)['ProductKey'].nunique()
+    keys = pd.MultiIndex.from_frame(group_values[product_dims]) if len(product_dims) > 1 else group_values[product_dims[0]]
+    return supply.reindex(keys).fillna(0).to_numpy(dtype=np.int64)
+
+
+def compute_gap_trends(sales_data: pd.DataFrame, products_full: pd.DataFrame,
+                       dims: Optional[List[str]] = None, bucket: str = 'month',
+                       window: Optional[int] = None, expanding: bool = False,
+                       territory_lookup: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Compute gap scores per dimension key and time bucket.
+
+    Args:
+        sales_data: Sales rows with OrderDate (column or index), OrderQuantity and the `dims` columns
+        products_full: Products with ProductKey, CategoryName and SubcategoryName (the supply side)
+        dims: Dimension columns (default: ['CategoryName']); Region/Country need `territory_lookup`
+        bucket: Time bucket, one of 'day', 'week' or 'month'
+        window: Rolling window length in buckets; demand is summed over the last `window` buckets
+        expanding: Sum demand over all buckets up to and including each bucket
+        territory_lookup: Territory lookup, required when `dims` contains Region or Country
+
+    Returns:
+        DataFrame with the dims, the bucket column (Day/Week/Month, as Periods),
+        TotalQuantitySold, UniqueProducts and GapScore, one row per key and bucket
+        (buckets without sales are included with zero demand)
+
+    Demand is accumulated on a dense key x bucket grid, so rolling and expanding
+    windows are cumulative-sum differences rather than per-group rolling calls.
+    GapScore uses the same (demand + 1) / (supply + 1) formula as compute_gap_score.
+    """
+    if bucket not in TIME_BUCKETS:
+        raise ValueError(f"Unknown bucket '{bucket}'. Available: {list(TIME_BUCKETS)}")
+    if window is not None and expanding:
+        raise ValueError("Use either a rolling window or an expanding window, not both")
+    if window is not None and window < 1:
+        raise ValueError("window must be at least 1 bucket")
+    dims = list(dims or ['CategoryName'])
+    freq, bucket_col = TIME_BUCKETS[bucket]
+
+    columns = {dim: sales_data[dim].to_numpy() for dim in dims if dim not in TERRITORY_COLUMNS}
+    if set(dims) & set(TERRITORY_COLUMNS):
+        if territory_lookup is None:
+            raise ValueError("territory_lookup is required for Region/Country dims")
+        columns.update(_attach_territory_codes(sales_data, territory_lookup))
+
+    # Factorize keys and buckets; rows with a missing key or date are dropped, as groupby does
+    dim_codes = [pd.factorize(columns[dim], sort=True) for dim in dims]
+    ordinals = pd.PeriodIndex(_order_dates(sales_data), freq=freq).asi8
+    valid = (ordinals != np.iinfo(np.int64).min)
+    for codes, _ in dim_codes:
+        valid &= codes >= 0
+
+    shape = [len(values) for _, values in dim_codes]
+    combined = np.ravel_multi_index([codes[valid] for codes, _ in dim_codes], shape)
+    group_codes, group_keys = pd.factorize(combined, sort=True)
+    n_groups = len(group_keys)
+
+    first_ordinal = ordinals[valid].min() if valid.any() else 0
+    bucket_codes = ordinals[valid] - first_ordinal
+    n_buckets = int(bucket_codes.max()) + 1 if len(bucket_codes) else 0
+
+    quantity = sales_data['OrderQuantity'].to_numpy()[valid]
+    demand = np.bincount(group_codes * n_buckets + bucket_codes, weights=quantity,
+                         minlength=n_groups * n_buckets).reshape(n_groups, n_buckets)
+    if window is not None or expanding:
+        cumulative = np.cumsum(demand, axis=1)
+        if expanding:
+            demand = cumulative
+        else:
+            demand = cumulative.copy()
+            demand[:, window:] -= cumulative[:, :-window]
+    if np.issubdtype(quantity.dtype, np.integer):
+        demand = demand.round().astype(np.int64)
+
+    group_values = pd.DataFrame({
+        dim: values.take(codes)
+        for dim, (_, values), codes in zip(dims, dim_codes, np.unravel_index(group_keys, shape))
+    })
+    supply = _supply_per_group(products_full, dims, group_values)
+
+    result = group_values.loc[np.repeat(np.arange(n_groups), n_buckets)].reset_index(drop=True)
+    periods = pd.period_range(start=pd.Period(ordinal=first_ordinal, freq=freq), periods=n_buckets, freq=freq)
+    result[bucket_col] = periods.take(np.tile(np.arange(n_buckets), n_groups))
+    result['TotalQuantitySold'] = demand.ravel()
+    result['UniqueProducts'] = np.repeat(supply, n_buckets)
+    result['GapScore'] = ((result['TotalQuantitySold'] + 1) / (result['UniqueProducts'] + 1)).round(2)
+    return result
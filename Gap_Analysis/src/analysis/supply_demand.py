@@ -1,3 +1,6 @@
+from typing import Dict, Iterable, Optional
+
+import numpy as np
 import pandas as pd
 
 
@@ -21,69 +24,160 @@ def compute_subcategory_supply(sales_data: pd.DataFrame, products_full: pd.DataF
     return supply
 
 
+# Dimension columns of each demand rollup level, in output column order
+DEMAND_LEVELS = {
+    'category': ['CategoryName'],
+    'subcategory': ['CategoryName', 'SubcategoryName'],
+    'region': ['Region'],
+    'country': ['Region', 'Country'],
+    'region_category': ['Region', 'CategoryName'],
+    'territory': ['Region', 'Country', 'CategoryName'],
+    'subcategory_territory': ['Region', 'Country', 'CategoryName', 'SubcategoryName'],
+}
+
+TERRITORY_COLUMNS = ['Region', 'Country']
+DEMAND_METRICS = ['UniqueOrders', 'TotalQuantitySold', 'UniqueCustomers']
+
+
+def _attach_territory_codes(sales_data: pd.DataFrame, territory_lookup: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Map every sales row to Region/Country by joining the lookup on the distinct TerritoryKeys only."""
+    key_codes, keys = pd.factorize(sales_data['TerritoryKey'])
+    lookup = territory_lookup.rename(columns={'SalesTerritoryKey': 'TerritoryKey'})
+    lookup = lookup.drop_duplicates('TerritoryKey').set_index('TerritoryKey')
+    matched = lookup.reindex(keys)[TERRITORY_COLUMNS]
+
+    columns = {}
+    for column in TERRITORY_COLUMNS:
+        per_key = matched[column].to_numpy()
+        # Rows with a missing TerritoryKey (code -1) get NaN, exactly like a left merge
+        columns[column] = np.append(per_key, np.nan)[key_codes] if len(per_key) else np.full(len(sales_data), np.nan)
+    return columns
+
+
+def _distinct_per_group(group_of_pair: np.ndarray, value_of_pair: np.ndarray,
+                        n_values: int, n_groups: int) -> np.ndarray:
+    """Exact number of distinct values per group from (group, value) pairs; negative groups are dropped."""
+    keep = group_of_pair >= 0
+    pairs = np.unique(group_of_pair[keep].astype(np.int64) * n_values + value_of_pair[keep])
+    return np.bincount(pairs // n_values, minlength=n_groups)
+
+
+def compute_demand_cube(sales_data: pd.DataFrame, territory_lookup: Optional[pd.DataFrame] = None,
+                        levels: Optional[Iterable[str]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Compute order metrics for several rollup levels in a single pass over the sales table.
+
+    Args:
+        sales_data: Sales rows with CategoryName/SubcategoryName, OrderNumber, OrderQuantity,
+            CustomerKey and (for territory levels) TerritoryKey
+        territory_lookup: Territory lookup with SalesTerritoryKey, Region and Country;
+            required when any requested level uses Region or Country
+        levels: Names from DEMAND_LEVELS (default: every level the inputs allow)
+
+    Returns:
+        Dictionary mapping level name to a DataFrame with the level's dimension
+        columns followed by UniqueOrders, TotalQuantitySold and UniqueCustomers
+
+    Dimension keys are factorized once and the rows are reduced to the finest
+    grain of all requested levels; every coarser level is then rolled up from
+    that grain. Quantities are summed, while the distinct counts are taken over
+    deduplicated (group, order) and (group, customer) pairs, so they stay exact.
+    Rows with a missing dimension value are dropped from the levels that use
+    that dimension, as `groupby` does.
+    """
+    if levels is None:
+        available = set(sales_data.columns) | (set(TERRITORY_COLUMNS) if territory_lookup is not None else set())
+        levels = [name for name, dims in DEMAND_LEVELS.items() if set(dims) <= available]
+    levels = list(levels)
+    unknown = [name for name in levels if name not in DEMAND_LEVELS]
+    if unknown:
+        raise ValueError(f"Unknown demand levels: {unknown}. Available: {list(DEMAND_LEVELS)}")
+
+    dims = [dim for dim in ['Region', 'Country', 'CategoryName', 'SubcategoryName']
+            if any(dim in DEMAND_LEVELS[name] for name in levels)]
+    territory = {}
+    if set(dims) & set(TERRITORY_COLUMNS):
+        if territory_lookup is None:
+            raise ValueError("territory_lookup is required for Region/Country levels")
+        territory = _attach_territory_codes(sales_data, territory_lookup)
+
+    # Factorize every dimension once; -1 marks a missing value
+    dim_codes, dim_values = {}, {}
+    for dim in dims:
+        column = territory[dim] if dim in territory else sales_data[dim]
+        dim_codes[dim], dim_values[dim] = pd.factorize(column, sort=True)
+
+    # Finest grain: one group per combination of all requested dimensions (missing values included)
+    shape = [len(dim_values[dim]) + 1 for dim in dims]
+    combined = np.ravel_multi_index([dim_codes[dim] + 1 for dim in dims], shape) if dims else np.zeros(len(sales_data), dtype=np.int64)
+    fine_codes, fine_keys = pd.factorize(combined)
+    fine_dims = np.array(np.unravel_index(fine_keys, shape)).reshape(len(dims), -1) - 1 if dims else np.zeros((0, len(fine_keys)), dtype=np.int64)
+    n_fine = len(fine_keys)
+
+    quantity = sales_data['OrderQuantity'].to_numpy()
+    fine_quantity = np.bincount(fine_codes, weights=quantity, minlength=n_fine)
+    if np.issubdtype(quantity.dtype, np.integer):
+        fine_quantity = fine_quantity.round().astype(quantity.dtype)
+
+    # Deduplicate (fine group, order) and (fine group, customer) pairs once for all levels
+    distinct_pairs = {}
+    for metric, column in [('UniqueOrders', 'OrderNumber'), ('UniqueCustomers', 'CustomerKey')]:
+        value_codes, values = pd.factorize(sales_data[column])
+        valid = value_codes >= 0  # nunique ignores missing values
+        n_values = max(len(values), 1)
+        pairs = np.unique(fine_codes[valid].astype(np.int64) * n_values + value_codes[valid])
+        distinct_pairs[metric] = (pairs // n_values, pairs % n_values, n_values)
+
+    cube = {}
+    for name in levels:
+        level_dims = DEMAND_LEVELS[name]
+        rows = np.array([dims.index(dim) for dim in level_dims])
+        level_fine = fine_dims[rows]
+        complete = (level_fine >= 0).all(axis=0)
+
+        level_shape = [len(dim_values[dim]) for dim in level_dims]
+        level_key = np.full(n_fine, -1, dtype=np.int64)
+        level_key[complete] = np.ravel_multi_index(level_fine[:, complete], level_shape)
+        group_keys = np.unique(level_key[complete])  # sorted, so groups come out in groupby order
+        group_of_fine = np.where(complete, np.searchsorted(group_keys, level_key), -1)
+        n_groups = len(group_keys)
+
+        result = pd.DataFrame({
+            dim: dim_values[dim].take(codes)
+            for dim, codes in zip(level_dims, np.unravel_index(group_keys, level_shape))
+        })
+        total_quantity = np.zeros(n_groups, dtype=fine_quantity.dtype)
+        np.add.at(total_quantity, group_of_fine[complete], fine_quantity[complete])
+        for metric in DEMAND_METRICS:
+            if metric == 'TotalQuantitySold':
+                result[metric] = total_quantity
+            else:
+                pair_fine, pair_value, n_values = distinct_pairs[metric]
+                result[metric] = _distinct_per_group(group_of_fine[pair_fine], pair_value, n_values, n_groups)
+        cube[name] = result
+
+    return cube
+
+
 def compute_category_demand(sales_data: pd.DataFrame) -> pd.DataFrame:
     """Calculate order metrics per category."""
-    demand = sales_data.groupby('CategoryName').agg({
-        'OrderNumber': 'nunique',
-        'OrderQuantity': 'sum',
-        'CustomerKey': 'nunique'
-    }).reset_index()
-    
-    demand.columns = ['CategoryName', 'UniqueOrders', 'TotalQuantitySold', 'UniqueCustomers']
-    return demand
+    return compute_demand_cube(sales_data, levels=['category'])['category']
 
 
 def compute_subcategory_demand(sales_data: pd.DataFrame) -> pd.DataFrame:
     """Calculate order metrics per subcategory."""
-    demand = sales_data.groupby(['CategoryName', 'SubcategoryName']).agg({
-        'OrderNumber': 'nunique',
-        'OrderQuantity': 'sum',
-        'CustomerKey': 'nunique'
-    }).reset_index()
-    
-    demand.columns = ['CategoryName', 'SubcategoryName', 'UniqueOrders', 'TotalQuantitySold', 'UniqueCustomers']
-    return demand
+    return compute_demand_cube(sales_data, levels=['subcategory'])['subcategory']
 
 
 def compute_territory_demand(sales_data: pd.DataFrame, territory_lookup: pd.DataFrame) -> pd.DataFrame:
     """Calculate order metrics by geographic territory."""
-    territory_renamed = territory_lookup.rename(columns={'SalesTerritoryKey': 'TerritoryKey'})
-    
-    sales_with_territory = sales_data.merge(
-        territory_renamed[['TerritoryKey', 'Region', 'Country']],
-        on='TerritoryKey',
-        how='left'
-    )
-    
-    demand = sales_with_territory.groupby(['Region', 'Country', 'CategoryName']).agg({
-        'OrderNumber': 'nunique',
-        'OrderQuantity': 'sum',
-        'CustomerKey': 'nunique'
-    }).reset_index()
-    
-    demand.columns = ['Region', 'Country', 'CategoryName', 'UniqueOrders', 'TotalQuantitySold', 'UniqueCustomers']
-    return demand
+    return compute_demand_cube(sales_data, territory_lookup, levels=['territory'])['territory']
 
 
 def compute_subcategory_territory_demand(sales_data: pd.DataFrame, territory_lookup: pd.DataFrame) -> pd.DataFrame:
     """Calculate order metrics by subcategory and territory."""
-    territory_renamed = territory_lookup.rename(columns={'SalesTerritoryKey': 'TerritoryKey'})
-    
-    sales_with_territory = sales_data.merge(
-        territory_renamed[['TerritoryKey', 'Region', 'Country']],
-        on='TerritoryKey',
-        how='left'
-    )
-    
-    demand = sales_with_territory.groupby(['Region', 'Country', 'CategoryName', 'SubcategoryName']).agg({
-        'OrderNumber': 'nunique',
-        'OrderQuantity': 'sum',
-        'CustomerKey': 'nunique'
-    }).reset_index()
-    
-    demand.columns = ['Region', 'Country', 'CategoryName', 'SubcategoryName', 
-                     'UniqueOrders', 'TotalQuantitySold', 'UniqueCustomers']
-    return demand
+    return compute_demand_cube(sales_data, territory_lookup,
+                               levels=['subcategory_territory'])['subcategory_territory']
 
 
 def merge_supply_demand(supply: pd.DataFrame, demand: pd.DataFrame) -> pd.DataFrame:
@@ -0,0 +1,147 @@
+import math
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    from ..data.loader import load_excel_sheets
+except ImportError:
+    # Notebooks put src/ itself on sys.path and import `api` as a top-level package
+    from data.loader import load_excel_sheets
+
+DEFAULT_GAP_REPORT = Path(__file__).parent.parent.parent / "results" / "reports" / "comprehensive_gap_analysis.xlsx"
+
+# API table name -> sheet of the comprehensive gap report
+GAP_TABLES = {
+    'categories': 'Category Gaps',
+    'subcategories': 'Subcategory Gaps',
+    'territories': 'Territory Gaps',
+    'detailed': 'Detailed Gaps',
+}
+
+INDEXED_COLUMNS = ['Region', 'Country', 'CategoryName', 'SubcategoryName']
+
+
+def _index_key(value) -> str:
+    return str(value).strip().casefold()
+
+
+class GapTable:
+    """One gap table with JSON-ready rows, hash indexes on the dimension columns and precomputed sort orders."""
+
+    def __init__(self, name: str, df: pd.DataFrame):
+        self.name = name
+        self.columns = list(df.columns)
+        self.n_rows = len(df)
+        self.records = df.astype(object).where(df.notna(), None).to_dict('records')
+
+        # value -> sorted row positions, matched case-insensitively
+        self.indexes: Dict[str, Dict[str, np.ndarray]] = {}
+        self.values: Dict[str, List] = {}
+        for column in INDEXED_COLUMNS:
+            if column in df.columns:
+                codes, uniques = pd.factorize(df[column])
+                order = np.argsort(codes, kind='stable')
+                bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+                self.indexes[column] = {_index_key(value): order[bounds[i]:bounds[i + 1]]
+                                        for i, value in enumerate(uniques)}
+                self.values[column] = sorted(uniques.tolist(), key=str)
+
+        # (column, descending) -> row order and each row's rank in it; ties keep row order, missing values go last
+        self.sort_orders: Dict[tuple, np.ndarray] = {}
+        self.sort_ranks: Dict[tuple, np.ndarray] = {}
+        for column in df.columns:
+            for descending in (False, True):
+                order = (df[column].reset_index(drop=True)
+                         .sort_values(ascending=not descending, kind='stable', na_position='last')
+                         .index.to_numpy())
+                ranks = np.empty(self.n_rows, dtype=np.int64)
+                ranks[order] = np.arange(self.n_rows)
+                self.sort_orders[column, descending] = order
+                self.sort_ranks[column, descending] = ranks
+
+    def select(self, filters: Optional[Dict[str, Union[str, Iterable[str]]]] = None) -> Optional[np.ndarray]:
+        """Row positions matching every filter (values of one column are OR-ed), or None for all rows."""
+        rows = None
+        for column, wanted in (filters or {}).items():
+            if column not in self.indexes:
+                raise ValueError(f"Cannot filter '{self.name}' on '{column}'. "
+                                 f"Filterable columns: {list(self.indexes)}")
+            wanted = [wanted] if isinstance(wanted, str) else list(wanted)
+            postings = [self.indexes[column].get(_index_key(value)) for value in wanted]
+            postings = [p for p in postings if p is not None]
+            matched = np.unique(np.concatenate(postings)) if postings else np.empty(0, dtype=np.int64)
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+        return rows
+
+    def order(self, rows: Optional[np.ndarray], sort_by: Optional[str], descending: bool) -> np.ndarray:
+        if sort_by is None:
+            ordered = np.arange(self.n_rows) if rows is None else rows
+            return ordered[::-1] if descending else ordered
+        if sort_by not in self.columns:
+            raise ValueError(f"Cannot sort '{self.name}' by '{sort_by}'. Columns: {self.columns}")
+        if rows is None:
+            return self.sort_orders[sort_by, descending]
+        return rows[np.argsort(self.sort_ranks[sort_by, descending][rows], kind='stable')]
+
+
+class GapStore:
+    """
+    In-memory query layer over the gap tables behind /api/gaps/*.
+
+    Every table is converted to JSON-ready rows once, hash-indexed on Region,
+    Country, CategoryName and SubcategoryName and pre-sorted on every column,
+    so a filtered, sorted and paginated query only touches the matching row
+    positions instead of re-scanning a DataFrame.
+    """
+
+    def __init__(self, tables: Dict[str, pd.DataFrame]):
+        self.tables = {name: GapTable(name, df) for name, df in tables.items()}
+
+    @classmethod
+    def from_excel(cls, file_path: Union[str, Path] = DEFAULT_GAP_REPORT, **loader_kwargs) -> 'GapStore':
+        """Build the store from the comprehensive gap report (one sheet per table in GAP_TABLES)."""
+        sheets = load_excel_sheets(str(file_path), sheets=list(GAP_TABLES.values()), **loader_kwargs)
+        return cls({name: sheets[sheet] for name, sheet in GAP_TABLES.items()})
+
+    def table(self, name: str) -> GapTable:
+        if name not in self.tables:
+            raise ValueError(f"Unknown gap table '{name}'. Available: {list(self.tables)}")
+        return self.tables[name]
+
+    def query(self, table: str, filters: Optional[Dict[str, Union[str, Iterable[str]]]] = None,
+              sort_by: Optional[str] = None, descending: bool = False,
+              page: int = 1, page_size: int = 50) -> dict:
+        """
+        Filter, sort and paginate one gap table.
+
+        Args:
+            table: Table name from GAP_TABLES
+            filters: {column: value or values}; values are matched case-insensitively
+            sort_by: Column to sort by (default: the table's stored order)
+            descending: Reverse the sort order
+            page: 1-based page number
+            page_size: Rows per page
+
+        Returns:
+            Dictionary with items (the page's rows), total, page, page_size and pages
+        """
+        if page < 1 or page_size < 1:
+            raise ValueError("page and page_size must be positive")
+        gap_table = self.table(table)
+        ordered = gap_table.order(gap_table.select(filters), sort_by, descending)
+
+        start = (page - 1) * page_size
+        return {
+            'items': [gap_table.records[i] for i in ordered[start:start + page_size]],
+            'total': int(len(ordered)),
+            'page': page,
+            'page_size': page_size,
+            'pages': math.ceil(len(ordered) / page_size),
+        }
+
+    def facets(self, table: str) -> Dict[str, List]:
+        """Distinct values of every filterable column, for building filter controls."""
+        return dict(self.table(table).values)
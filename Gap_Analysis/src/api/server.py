@@ -0,0 +1,324 @@
+"""
+Asyncio HTTP service for the /api/gaps/* and /api/insights/* routes documented in the README.
+
+All payloads are preloaded into memory (the gap tables behind a GapStore, the
+subcategory summary and the text insights) and served as JSON with ETags,
+conditional GET (304), gzip and pagination. A background task watches the
+source files and swaps in freshly loaded data when a new report lands.
+
+Run from the Gap_Analysis directory:
+
+    python -m src.api.server --port 8000
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .gap_store import GAP_TABLES, GapStore
+
+DEFAULT_RESULTS_DIR = Path(__file__).parent.parent.parent / "results"
+
+# Source files relative to the results directory; the gap report is required, the rest are optional
+GAP_REPORT = Path("reports") / "comprehensive_gap_analysis.xlsx"
+INTERPRETATION_FILE = Path("insights") / "interpretation_and_insights.txt"
+CHART_INSIGHTS_FILE = Path("visualizations_subcategory") / "insights_subcategory.txt"
+SUBCATEGORY_SUMMARY_FILE = Path("visualizations_subcategory") / "data" / "subcategory_gap_summary.json"
+
+# Query parameter -> indexed gap column
+FILTER_PARAMS = {
+    'region': 'Region',
+    'country': 'Country',
+    'category': 'CategoryName',
+    'subcategory': 'SubcategoryName',
+}
+
+MAX_PAGE_SIZE = 1000
+GZIP_MIN_BYTES = 1024
+RESPONSE_CACHE_SIZE = 1024
+STATUS_TEXT = {200: 'OK', 204: 'No Content', 304: 'Not Modified', 400: 'Bad Request',
+               404: 'Not Found', 405: 'Method Not Allowed', 503: 'Service Unavailable'}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_recommendations(text: str) -> List[dict]:
+    """Numbered items of the 'business recommendations' section as {title, detail} dicts."""
+    section = re.search(r"business recommendations\n-+\n(.*?)\n\n\n", text, re.S | re.I)
+    if not section:
+        return []
+    items = []
+    for match in re.finditer(r"^\s*(\d+)\.\s*(.+)\n((?:[ \t]+.+\n?)*)", section.group(1), re.M):
+        detail = " ".join(line.strip() for line in match.group(3).splitlines() if line.strip())
+        items.append({'rank': int(match.group(1)), 'title': match.group(2).strip(), 'detail': detail})
+    return items
+
+
+def parse_text_sections(text: str) -> Dict[str, str]:
+    """Sections of a report whose headings are underlined with dashes, as {heading: body}."""
+    sections = {}
+    for match in re.finditer(r"^([^\n]+)\n-{10,}\n(.*?)(?=^[^\n]+\n-{10,}\n|^={10,}|\Z)", text, re.S | re.M):
+        sections[match.group(1).strip()] = match.group(2).strip()
+    return sections
+
+
+class AnalyticsData:
+    """One immutable, fully loaded generation of everything the API serves."""
+
+    def __init__(self, results_dir: Path):
+        self.results_dir = Path(results_dir)
+        self.fingerprint = self.source_fingerprint(self.results_dir)
+        self.version = hashlib.sha1(repr(self.fingerprint).encode()).hexdigest()[:12]
+        self.loaded_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+        self.gap_store = GapStore.from_excel(self.results_dir / GAP_REPORT)
+
+        self.interpretation = self._read_text(INTERPRETATION_FILE)
+        self.recommendations = parse_recommendations(self.interpretation) if self.interpretation else None
+        chart_text = self._read_text(CHART_INSIGHTS_FILE)
+        self.chart_insights = parse_text_sections(chart_text) if chart_text else None
+
+        summary_path = self.results_dir / SUBCATEGORY_SUMMARY_FILE
+        self.subcategory_summary = json.loads(summary_path.read_text(encoding='utf-8')) if summary_path.exists() else None
+
+    def _read_text(self, relative_path: Path) -> Optional[str]:
+        path = self.results_dir / relative_path
+        return path.read_text(encoding='utf-8') if path.exists() else None
+
+    @staticmethod
+    def source_fingerprint(results_dir: Path) -> Tuple:
+        """(path, mtime, size) of every source file; a change means a new report has landed."""
+        fingerprint = []
+        for relative_path in (GAP_REPORT, INTERPRETATION_FILE, CHART_INSIGHTS_FILE, SUBCATEGORY_SUMMARY_FILE):
+            path = Path(results_dir) / relative_path
+            if path.exists():
+                stat = path.stat()
+                fingerprint.append((str(relative_path), stat.st_mtime_ns, stat.st_size))
+        return tuple(fingerprint)
+
+
+def _paginate(items: list, page: int, page_size: int) -> dict:
+    start = (page - 1) * page_size
+    return {
+        'items': items[start:start + page_size],
+        'total': len(items),
+        'page': page,
+        'page_size': page_size,
+        'pages': -(-len(items) // page_size),
+    }
+
+
+class AnalyticsAPI:
+    """Routes requests against the current AnalyticsData and caches encoded responses per data version."""
+
+    def __init__(self, results_dir: Path = DEFAULT_RESULTS_DIR, reload_interval: float = 5.0,
+                 cors_origin: Optional[str] = '*'):
+        self.results_dir = Path(results_dir)
+        self.reload_interval = reload_interval
+        self.cors_origin = cors_origin
+        self.data = AnalyticsData(self.results_dir)
+        self._responses: Dict[str, Tuple[bytes, bytes, str]] = {}
+
+    # ===== DATA RELOADING =====
+
+    async def watch(self) -> None:
+        """Poll the source files and hot-swap the data when they change."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            if AnalyticsData.source_fingerprint(self.results_dir) == self.data.fingerprint:
+                continue
+            try:
+                # Load off the event loop; requests keep being served from the old generation meanwhile
+                fresh = await loop.run_in_executor(None, AnalyticsData, self.results_dir)
+            except Exception as e:  # a half-written report: keep serving, retry next poll
+                print(f"⚠️  Reload failed, keeping version {self.data.version}: {e}")
+                continue
+            self.data, self._responses = fresh, {}
+            print(f"🔄 Reloaded analytics data (version {fresh.version})")
+
+    # ===== ROUTING =====
+
+    def _int_param(self, params: Dict[str, List[str]], name: str, default: int, maximum: int = None) -> int:
+        try:
+            value = int(params.get(name, [default])[0])
+        except ValueError:
+            raise ApiError(400, f"'{name}' must be an integer")
+        if value < 1 or (maximum is not None and value > maximum):
+            raise ApiError(400, f"'{name}' must be between 1 and {maximum or 'infinity'}")
+        return value
+
+    def route(self, path: str, params: Dict[str, List[str]]) -> object:
+        data = self.data
+        page = self._int_param(params, 'page', 1)
+        page_size = self._int_param(params, 'page_size', 50, MAX_PAGE_SIZE)
+        parts = [part for part in path.split('/') if part]
+
+        if parts == ['api', 'health']:
+            return {'status': 'ok', 'version': data.version, 'loaded_at': data.loaded_at}
+
+        if parts[:2] == ['api', 'gaps']:
+            if len(parts) == 2:
+                return {'tables': list(GAP_TABLES)}
+            table = parts[2]
+            if table not in GAP_TABLES:
+                raise ApiError(404, f"Unknown gap table '{table}'. Available: {list(GAP_TABLES)}")
+            if parts[3:] == ['facets']:
+                return data.gap_store.facets(table)
+            if len(parts) > 3:
+                raise ApiError(404, f"Unknown route {path}")
+            filters = {FILTER_PARAMS[name]: [v for value in values for v in value.split(',') if v]
+                       for name, values in params.items() if name in FILTER_PARAMS}
+            order = params.get('order', ['asc'])[0].lower()
+            if order not in ('asc', 'desc'):
+                raise ApiError(400, "'order' must be 'asc' or 'desc'")
+            try:
+                return data.gap_store.query(table, filters, sort_by=params.get('sort', [None])[0],
+                                            descending=order == 'desc', page=page, page_size=page_size)
+            except ValueError as e:
+                raise ApiError(400, str(e))
+
+        if parts[:2] == ['api', 'insights'] and len(parts) == 3:
+            payloads = {
+                'interpretation': data.interpretation and {'text': data.interpretation},
+                'recommendations': data.recommendations is not None and _paginate(data.recommendations, page, page_size),
+                'charts': data.chart_insights is not None and {'sections': data.chart_insights},
+            }
+            if parts[2] not in payloads:
+                raise ApiError(404, f"Unknown insights route {path}")
+            if not payloads[parts[2]]:
+                raise ApiError(503, f"{path} has no source file in {self.results_dir}")
+            return payloads[parts[2]]
+
+        if parts == ['api', 'data', 'subcategory-summary']:
+            if data.subcategory_summary is None:
+                raise ApiError(503, f"{path} has no source file in {self.results_dir}")
+            return _paginate(data.subcategory_summary, page, page_size)
+
+        raise ApiError(404, f"Unknown route {path}")
+
+    def respond(self, target: str) -> Tuple[int, bytes, bytes, str]:
+        """(status, body, gzipped body or b'', etag) for a GET target, served from the per-version cache."""
+        cached = self._responses.get(target)
+        if cached is not None:
+            return (200,) + cached
+        url = urlsplit(target)
+        try:
+            payload, status = self.route(url.path, parse_qs(url.query)), 200
+        except ApiError as e:
+            payload, status = {'error': str(e), 'status': e.status}, e.status
+
+        body = json.dumps(payload, default=str, separators=(',', ':')).encode('utf-8')
+        compressed = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else b''
+        etag = f'"{self.data.version}-{hashlib.sha1(body).hexdigest()[:16]}"'
+        if status == 200:
+            if len(self._responses) >= RESPONSE_CACHE_SIZE:
+                self._responses.pop(next(iter(self._responses)))
+            self._responses[target] = (body, compressed, etag)
+        return status, body, compressed, etag
+
+    # ===== HTTP =====
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=15)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode('latin-1').split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                writer.write(self._build_response(method, target, headers, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _build_response(self, method: str, target: str, headers: Dict[str, str], keep_alive: bool) -> bytes:
+        extra = {'Connection': 'keep-alive' if keep_alive else 'close'}
+        if self.cors_origin:
+            extra['Access-Control-Allow-Origin'] = self.cors_origin
+        if method == 'OPTIONS':
+            extra.update({'Access-Control-Allow-Methods': 'GET, HEAD, OPTIONS',
+                          'Access-Control-Allow-Headers': 'If-None-Match, Accept-Encoding'})
+            return self._encode(204, b'', extra)
+        if method not in ('GET', 'HEAD'):
+            extra['Allow'] = 'GET, HEAD, OPTIONS'
+            body = json.dumps({'error': f"Method {method} not allowed", 'status': 405}).encode('utf-8')
+            return self._encode(405, body, dict(extra, **{'Content-Type': 'application/json'}))
+
+        status, body, compressed, etag = self.respond(target)
+        extra.update({'Content-Type': 'application/json; charset=utf-8', 'Vary': 'Accept-Encoding'})
+        if status == 200:
+            extra.update({'ETag': etag, 'Cache-Control': 'no-cache'})
+            if_none_match = headers.get('if-none-match', '')
+            if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match == '*':
+                return self._encode(304, b'', extra)
+        if compressed and 'gzip' in headers.get('accept-encoding', ''):
+            body = compressed
+            extra['Content-Encoding'] = 'gzip'
+        return self._encode(status, body, extra, head_only=method == 'HEAD')
+
+    @staticmethod
+    def _encode(status: int, body: bytes, headers: Dict[str, str], head_only: bool = False) -> bytes:
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        lines.append(f"Content-Length: {len(body)}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + (b'' if head_only else body)
+
+
+async def serve(host: str = '127.0.0.1', port: int = 8000, results_dir: Path = DEFAULT_RESULTS_DIR,
+                reload_interval: float = 5.0) -> None:
+    """Load the analytics data and serve it until cancelled."""
+    api = AnalyticsAPI(results_dir, reload_interval=reload_interval)
+    server = await asyncio.start_server(api.handle_connection, host, port)
+    watcher = asyncio.create_task(api.watch())
+    print(f"🚀 Serving gap analytics API (version {api.data.version}) on http://{host}:{port}/api/")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        watcher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the gap analysis results as a JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--results-dir", type=Path, default=DEFAULT_RESULTS_DIR,
+                        help="Results directory holding the gap report and insights")
+    parser.add_argument("--reload-interval", type=float, default=5.0,
+                        help="Seconds between checks for new result files")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.results_dir, args.reload_interval))
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,139 @@
+import hashlib
 import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
 import pandas as pd
 
+try:
+    import pyarrow  # noqa: F401  (parquet engine for the sheet cache)
+    CACHE_FORMAT = "parquet"
+except ImportError:
+    CACHE_FORMAT = "pickle"
+
+
+def _workbook_hash(file_path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_path(cache_dir: Path, workbook_hash: str, sheet: str) -> Path:
+    sheet_id = hashlib.sha256(sheet.encode("utf-8")).hexdigest()[:16]
+    suffix = ".parquet" if CACHE_FORMAT == "parquet" else ".pkl"
+    return cache_dir / f"{workbook_hash[:16]}_{sheet_id}{suffix}"
+
+
+def _read_cached(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns)
+    df = pd.read_pickle(path)
+    return df[columns] if columns is not None else df
+
+
+def _write_cached(df: pd.DataFrame, path: Path) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    if CACHE_FORMAT == "parquet":
+        try:
+            df.to_parquet(tmp_path, index=False)
+        except (TypeError, ValueError, ImportError):
+            # Mixed-type object columns can't be written as parquet; keep a pickle instead
+            path = path.with_suffix(".pkl")
+            tmp_path = path.with_suffix(".pkl.tmp")
+            df.to_pickle(tmp_path)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _parse_sheet(file_path: str, sheet: str) -> pd.DataFrame:
+    return pd.read_excel(file_path, sheet_name=sheet)
 
-def load_excel_sheets(file_path: str):
+
+def load_excel_sheets(file_path: str, sheets: Optional[Union[str, Iterable[str]]] = None,
+                      usecols: Optional[Union[List[str], Dict[str, List[str]]]] = None,
+                      max_workers: Optional[int] = None,
+                      cache_dir: Optional[str] = None, use_cache: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    Load sheets from an Excel workbook, in parallel and with a per-sheet cache.
+
+    Args:
+        file_path: Path to the workbook
+        sheets: Sheet name or names to load (default: all sheets)
+        usecols: Columns to keep, either one list for every sheet or {sheet: columns}
+        max_workers: Worker processes used to parse uncached sheets (default: one per sheet, up to CPU count)
+        cache_dir: Where parsed sheets are cached (default: `.sheet_cache` next to the workbook)
+        use_cache: Set to False to always re-parse the workbook
+
+    Returns:
+        Dictionary mapping sheet name to DataFrame, in the requested order
+
+    Each sheet is cached in a columnar binary format (parquet, or pickle when
+    pyarrow is unavailable) keyed by the workbook's SHA-256 and the sheet name,
+    so any change to the workbook invalidates its cached sheets.
+    """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
 
-    try:
-        excel_file = pd.ExcelFile(file_path)
-        dataframes = {}
-        for sheet in excel_file.sheet_names:
-            df = excel_file.parse(sheet_name=sheet)
+    with pd.ExcelFile(file_path) as excel_file:
+        available = excel_file.sheet_names
+
+    if isinstance(sheets, str):
+        sheets = [sheets]
+    selected = available if sheets is None else list(sheets)
+    missing = [sheet for sheet in selected if sheet not in available]
+    if missing:
+        raise ValueError(f"Sheets not found in {file_path}: {missing}. Available: {available}")
+
+    def columns_for(sheet: str) -> Optional[List[str]]:
+        if isinstance(usecols, dict):
+            return usecols.get(sheet)
+        return usecols
+
+    cache_root = Path(cache_dir) if cache_dir else Path(file_path).parent / ".sheet_cache"
+    workbook_hash = _workbook_hash(file_path) if use_cache else None
+
+    dataframes = {}
+    to_parse = []
+    for sheet in selected:
+        path = _cache_path(cache_root, workbook_hash, sheet) if use_cache else None
+        if path is not None:
+            for candidate in (path, path.with_suffix(".pkl")):
+                if candidate.exists():
+                    dataframes[sheet] = candidate
+                    break
+        if sheet not in dataframes:
+            to_parse.append(sheet)
+
+    if to_parse:
+        workers = max_workers or min(len(to_parse), os.cpu_count() or 1)
+        if workers > 1 and len(to_parse) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed = dict(zip(to_parse, pool.map(_parse_sheet, [file_path] * len(to_parse), to_parse)))
+        else:
+            parsed = {sheet: _parse_sheet(file_path, sheet) for sheet in to_parse}
+
+        if use_cache:
+            cache_root.mkdir(parents=True, exist_ok=True)
+        for sheet, df in parsed.items():
+            if use_cache:
+                _write_cached(df, _cache_path(cache_root, workbook_hash, sheet))
             dataframes[sheet] = df
 
-        return dataframes
+    result = {}
+    for sheet in selected:
+        loaded = dataframes[sheet]
+        columns = columns_for(sheet)
+        if isinstance(loaded, Path):
+            loaded = _read_cached(loaded, columns)
+        elif columns is not None:
+            loaded = loaded[columns]
+        result[sheet] = loaded
 
-    except Exception as e:
-        print(f"Error: {e}")
-        return {}
+    return result
 
 
 def summarize_excel_sheets(datasets: dict):
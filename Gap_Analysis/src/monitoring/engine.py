@@ -1,9 +1,14 @@
 import pandas as pd
-import json
 from pathlib import Path
 from datetime import datetime
 import numpy as np
 
+try:
+    from .snapshot_store import SnapshotStore
+except ImportError:
+    # Notebooks put src/ itself on sys.path and import `monitoring` as a top-level package
+    from monitoring.snapshot_store import SnapshotStore
+
 
 class MonitoringSnapshot:
     def __init__(self, snapshot_dir: Path = None):
@@ -11,55 +16,69 @@ class MonitoringSnapshot:
             snapshot_dir = Path(__file__).parent.parent / "results" / "monitoring_reports"
         self.snapshot_dir = Path(snapshot_dir)
         self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        self.store = SnapshotStore(self.snapshot_dir / "snapshots.sqlite")
+        if self.store.is_empty():
+            self.store.import_legacy_files(self.snapshot_dir)
 
     def save_snapshot(self, gap_df: pd.DataFrame, week_number: int = None, 
-                     snapshot_date: str = None) -> tuple:
+                     snapshot_date: str = None, export_files: bool = False) -> tuple:
+        """Store a snapshot in the SQLite store; with `export_files=True` also write
+        snapshot_week_<n>_<date>.json/.csv copies. Returns (json_path, csv_path), None when not exported."""
         if snapshot_date is None:
             snapshot_date = datetime.now().strftime("%Y-%m-%d")
         
         if week_number is None:
             week_number = datetime.now().isocalendar()[1]
 
-        snapshot_data = []
-        for _, row in gap_df.iterrows():
-            snapshot_data.append({
-                "date": snapshot_date,
-                "week": week_number,
-                "category": row['category'],
-                "supply": int(row['supply']),
-                "demand": int(row['demand']),
-                "gap_score": float(row['gap_score']),
-                "gap_status": row['gap_status'],
-                "normalized_gap": float(row.get('normalized_gap', 0))
-            })
+        snapshot_df = pd.DataFrame({
+            "date": snapshot_date,
+            "week": week_number,
+            "category": gap_df['category'].to_numpy(),
+            "supply": gap_df['supply'].astype('int64').to_numpy(),
+            "demand": gap_df['demand'].astype('int64').to_numpy(),
+            "gap_score": gap_df['gap_score'].astype(float).to_numpy(),
+            "gap_status": gap_df['gap_status'].to_numpy(),
+            "normalized_gap": (gap_df['normalized_gap'].astype(float).to_numpy()
+                               if 'normalized_gap' in gap_df.columns else 0.0),
+        })
+
+        self.store.append(snapshot_df, snapshot_date, week_number)
+
+        if not export_files:
+            return None, None
 
         json_path = self.snapshot_dir / f"snapshot_week_{week_number}_{snapshot_date}.json"
-        with open(json_path, 'w') as f:
-            json.dump(snapshot_data, f, indent=2)
+        snapshot_df.to_json(json_path, orient='records', indent=2, double_precision=15)
 
         csv_path = self.snapshot_dir / f"snapshot_week_{week_number}_{snapshot_date}.csv"
-        snapshot_df = pd.DataFrame(snapshot_data)
         snapshot_df.to_csv(csv_path, index=False)
 
         return str(json_path), str(csv_path)
 
     def load_latest_snapshot(self) -> pd.DataFrame:
-        json_files = sorted(self.snapshot_dir.glob("snapshot_*.json"), reverse=True)
-        if not json_files:
-            return None
-        
-        with open(json_files[0], 'r') as f:
-            data = json.load(f)
-        return pd.DataFrame(data)
+        return self.store.latest()
 
     def load_snapshot_by_date(self, snapshot_date: str) -> pd.DataFrame:
-        json_file = list(self.snapshot_dir.glob(f"snapshot_*_{snapshot_date}.json"))
-        if not json_file:
-            return None
-        
-        with open(json_file[0], 'r') as f:
-            data = json.load(f)
-        return pd.DataFrame(data)
+        return self.store.by_date(snapshot_date)
+
+    def load_snapshot_by_week(self, week_number: int, year: int = None) -> pd.DataFrame:
+        if year is None:
+            year = datetime.now().isocalendar()[0]
+        return self.store.by_week(year, week_number)
+
+    def load_history(self, start: str = None, end: str = None, categories: list = None) -> pd.DataFrame:
+        """Every snapshot row dated within [start, end] in one read, typed for trend charts
+        (e.g. create_gap_trend_chart): date as datetime64, gap_status as a categorical."""
+        history = self.store.between(start, end, categories)
+        return history.astype({
+            "date": "datetime64[ns]",
+            "week": "int64",
+            "supply": "int64",
+            "demand": "int64",
+            "gap_score": "float64",
+            "gap_status": "category",
+            "normalized_gap": "float64",
+        })
 
 
 class GapChangeAnalyzer:
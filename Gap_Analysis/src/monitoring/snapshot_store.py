@@ -0,0 +1,161 @@
+import json
+import re
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+SNAPSHOT_COLUMNS = ["date", "week", "category", "supply", "demand",
+                    "gap_score", "gap_status", "normalized_gap"]
+
+LEGACY_FILE_PATTERN = re.compile(r"snapshot_week_(\d+)_(\d{4}-\d{2}-\d{2})\.json$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date        TEXT    NOT NULL,
+    year        INTEGER NOT NULL,
+    week        INTEGER NOT NULL,
+    created_at  TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_date ON snapshots (date, snapshot_id);
+CREATE INDEX IF NOT EXISTS idx_snapshots_week ON snapshots (year, week, snapshot_id);
+
+CREATE TABLE IF NOT EXISTS snapshot_rows (
+    snapshot_id    INTEGER NOT NULL REFERENCES snapshots (snapshot_id),
+    position       INTEGER NOT NULL,
+    category       TEXT    NOT NULL,
+    supply         INTEGER NOT NULL,
+    demand         INTEGER NOT NULL,
+    gap_score      REAL    NOT NULL,
+    gap_status     TEXT,
+    normalized_gap REAL,
+    PRIMARY KEY (snapshot_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_snapshot_rows_category ON snapshot_rows (category, snapshot_id);
+"""
+
+ROW_QUERY = """
+SELECT s.date, s.week, r.category, r.supply, r.demand, r.gap_score, r.gap_status, r.normalized_gap
+FROM snapshot_rows r JOIN snapshots s ON s.snapshot_id = r.snapshot_id
+"""
+
+
+class SnapshotStore:
+    """
+    SQLite store of weekly gap snapshots, one snapshot per date.
+
+    Each save writes one `snapshots` row (date, ISO year, week) and one
+    `snapshot_rows` row per category, replacing any earlier snapshot of the
+    same date. Snapshots are ordered by date and then by insertion, never by
+    file name, and the date, (year, week) and (category, snapshot) indexes
+    keep latest, by-date and range lookups independent of how many weeks have
+    been stored.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def append(self, snapshot_df: pd.DataFrame, snapshot_date: str, week_number: int) -> int:
+        """Store one snapshot (a frame with SNAPSHOT_COLUMNS) in a single transaction and return its id.
+
+        A snapshot already stored for `snapshot_date` is replaced, so re-running a day's save
+        does not duplicate that day in the history.
+        """
+        year = datetime.strptime(snapshot_date, "%Y-%m-%d").isocalendar()[0]
+        normalized = (snapshot_df["normalized_gap"] if "normalized_gap" in snapshot_df.columns
+                      else pd.Series(0.0, index=snapshot_df.index))
+        status = (snapshot_df["gap_status"] if "gap_status" in snapshot_df.columns
+                  else pd.Series(None, index=snapshot_df.index, dtype=object))
+        rows = zip(range(len(snapshot_df)),
+                   snapshot_df["category"].astype(str).tolist(),
+                   snapshot_df["supply"].astype("int64").tolist(),
+                   snapshot_df["demand"].astype("int64").tolist(),
+                   snapshot_df["gap_score"].astype(float).tolist(),
+                   status.astype(object).where(status.notna(), None).tolist(),
+                   normalized.fillna(0).astype(float).tolist())
+        with closing(self._connect()) as conn, conn:
+            stale = "SELECT snapshot_id FROM snapshots WHERE date = ?"
+            conn.execute(f"DELETE FROM snapshot_rows WHERE snapshot_id IN ({stale})", (snapshot_date,))
+            conn.execute("DELETE FROM snapshots WHERE date = ?", (snapshot_date,))
+            cursor = conn.execute(
+                "INSERT INTO snapshots (date, year, week, created_at) VALUES (?, ?, ?, ?)",
+                (snapshot_date, year, int(week_number), datetime.now().isoformat(timespec="seconds")))
+            snapshot_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO snapshot_rows (snapshot_id, position, category, supply, demand, gap_score, "
+                "gap_status, normalized_gap) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((snapshot_id,) + row for row in rows))
+        return snapshot_id
+
+    def _read(self, where: str, params: tuple = ()) -> pd.DataFrame:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"{ROW_QUERY} WHERE {where} ORDER BY s.date, s.snapshot_id, r.position",
+                                params).fetchall()
+        return pd.DataFrame(rows, columns=SNAPSHOT_COLUMNS)
+
+    def _snapshot_rows(self, snapshot_id: Optional[int]) -> Optional[pd.DataFrame]:
+        if snapshot_id is None:
+            return None
+        return self._read("r.snapshot_id = ?", (snapshot_id,))
+
+    def _single_id(self, sql: str, params: tuple = ()) -> Optional[int]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    def latest(self) -> Optional[pd.DataFrame]:
+        return self._snapshot_rows(self._single_id(
+            "SELECT snapshot_id FROM snapshots ORDER BY date DESC, snapshot_id DESC LIMIT 1"))
+
+    def by_date(self, snapshot_date: str) -> Optional[pd.DataFrame]:
+        return self._snapshot_rows(self._single_id(
+            "SELECT snapshot_id FROM snapshots WHERE date = ? ORDER BY snapshot_id DESC LIMIT 1",
+            (snapshot_date,)))
+
+    def by_week(self, year: int, week_number: int) -> Optional[pd.DataFrame]:
+        return self._snapshot_rows(self._single_id(
+            "SELECT snapshot_id FROM snapshots WHERE year = ? AND week = ? ORDER BY date DESC, snapshot_id DESC LIMIT 1",
+            (year, week_number)))
+
+    def between(self, start: Optional[str] = None, end: Optional[str] = None,
+                categories: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Rows of every snapshot dated within [start, end] (inclusive ISO dates, open-ended when None),
+        optionally only for `categories`."""
+        where, params = "s.date BETWEEN ? AND ?", [start or "0000-00-00", end or "9999-99-99"]
+        if categories is not None:
+            categories = list(categories)
+            where += f" AND r.category IN ({', '.join('?' * len(categories))})"
+            params += categories
+        return self._read(where, tuple(params))
+
+    def dates(self) -> List[str]:
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT date FROM snapshots ORDER BY date")]
+
+    def import_legacy_files(self, snapshot_dir: Path) -> int:
+        """Append the per-week snapshot_week_<n>_<date>.json files of older versions, oldest first."""
+        found = []
+        for path in Path(snapshot_dir).glob("snapshot_week_*.json"):
+            match = LEGACY_FILE_PATTERN.search(path.name)
+            if match:
+                found.append((match.group(2), int(match.group(1)), path))
+        for snapshot_date, week_number, path in sorted(found):
+            with open(path, "r") as f:
+                self.append(pd.DataFrame(json.load(f)), snapshot_date, week_number)
+        return len(found)
+
+    def is_empty(self) -> bool:
+        return self._single_id("SELECT snapshot_id FROM snapshots LIMIT 1") is None
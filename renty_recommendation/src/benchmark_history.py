@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""BENCHMARK_HISTORY
+
+Persisted benchmark history for the recommendation pipeline.
+
+Every run appends its quality metrics, training time, evaluation time and
+peak memory as one JSON line to a local store. The baseline for the next run
+is the mean of the last N runs with the same label, so runs that reused a
+cached model are never compared with runs that trained one, and a regression
+report flags metrics that got worse (lower quality, or slower / more memory)
+beyond a tolerance.
+"""
+
+import json
+import os
+import platform
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+"""## BENCHMARK STORE"""
+
+# Metrics where a smaller value is an improvement; everything else is higher-is-better
+LOWER_IS_BETTER = ('overfitting_gap', 'popularity@', '_seconds', '_mb')
+
+
+def lower_is_better(metric):
+    return any(token in metric for token in LOWER_IS_BETTER)
+
+
+class BenchmarkStore:
+    """Append-only JSONL store of pipeline runs"""
+
+    def __init__(self, path='renty_benchmarks.jsonl'):
+        self.path = Path(path)
+
+    def append(self, metrics, performance=None, params=None, label=None):
+        """Record one run: quality `metrics`, `performance` (timings, memory) and parameters"""
+        record = {
+            'run_at': datetime.now().isoformat(timespec='seconds'),
+            'label': label,
+            'host': platform.node(),
+            'cpu_count': os.cpu_count(),
+            'params': params or {},
+            'metrics': {k: float(v) for k, v in metrics.items()},
+            'performance': {k: float(v) for k, v in (performance or {}).items() if v is not None},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+        print(f"Benchmark run appended to {self.path}")
+        return record
+
+    def records(self, last_n=None, label=None):
+        """The last `last_n` runs recorded with `label` (None selects unlabelled runs)"""
+        if not self.path.exists():
+            return []
+        with open(self.path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        records = [record for record in records if record.get('label') == label]
+        return records[-last_n:] if last_n else records
+
+    def history(self, last_n=None, label=None):
+        """One row per run, with metrics and performance flattened into columns"""
+        rows = []
+        for record in self.records(last_n, label):
+            rows.append({
+                'run_at': record['run_at'],
+                'label': record['label'],
+                'host': record['host'],
+                **record['metrics'],
+                **record['performance'],
+            })
+        return pd.DataFrame(rows)
+
+    def baseline(self, last_n=5, label=None):
+        """Mean of every metric over the last `last_n` runs with `label` (None when there is no history)"""
+        history = self.history(last_n, label)
+        if history.empty:
+            return None
+        return history.select_dtypes(include=[np.number]).mean().to_dict()
+
+    def regression_report(self, current, last_n=5, tolerance=0.05, label=None):
+        """Compare `current` (metrics + performance) with the mean of the last `last_n` runs with `label`.
+
+        A metric is flagged when it moved in the wrong direction by more than
+        `tolerance` (relative) and by more than two standard deviations of the
+        history, so ordinary run-to-run noise is not reported.
+        """
+        print("\n" + "=" * 80)
+        print(f"BENCHMARK REGRESSION REPORT (vs last {last_n} runs)")
+        print("=" * 80)
+
+        history = self.history(last_n, label)
+        if history.empty:
+            print("  No benchmark history yet; this run becomes the first baseline")
+            return pd.DataFrame()
+
+        rows = []
+        for metric, value in current.items():
+            if metric not in history.columns or value is None:
+                continue
+            past = history[metric].dropna()
+            if past.empty:
+                continue
+            mean, std = past.mean(), past.std(ddof=0)
+            change = (value - mean) / abs(mean) if mean else 0.0
+            worse = -change if not lower_is_better(metric) else change
+            rows.append({
+                'metric': metric,
+                'current': value,
+                'baseline_mean': mean,
+                'baseline_std': std,
+                'change_pct': change * 100,
+                'regressed': bool(worse > tolerance and abs(value - mean) > 2 * std),
+            })
+
+        report = pd.DataFrame(rows)
+        if report.empty:
+            print("  No metrics in common with the benchmark history")
+            return report
+        regressions = report[report['regressed']]
+        if regressions.empty:
+            print(f"  No regressions across {len(report)} tracked metrics")
+        for _, row in regressions.iterrows():
+            print(f"  REGRESSION {row['metric']:<20} {row['current']:.4f} vs "
+                  f"{row['baseline_mean']:.4f} ({row['change_pct']:+.1f}%)")
+        return report
@@ -9,10 +9,317 @@ Original file is located at
 
 
 
+"""## SINGLE-PASS RANKING EVALUATOR"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+
+class RankingAccumulator:
+    """Mergeable per-user metric sums for one interaction set"""
+
+    def __init__(self, n_items=None):
+        self.n_users = 0
+        self.sums = {}
+        self.recommended = {}  # k -> boolean mask of items shown in any top-k list
+        self.n_items = n_items
+
+    def add(self, name, values):
+        self.sums[name] = self.sums.get(name, 0.0) + float(np.sum(values))
+
+    def mark_recommended(self, k, top_items):
+        if k not in self.recommended:
+            self.recommended[k] = np.zeros(self.n_items, dtype=bool)
+        self.recommended[k][top_items.ravel()] = True
+
+    def merge(self, other):
+        self.n_users += other.n_users
+        for name, value in other.sums.items():
+            self.sums[name] = self.sums.get(name, 0.0) + value
+        for k, mask in other.recommended.items():
+            self.recommended[k] = self.recommended[k] | mask if k in self.recommended else mask.copy()
+        return self
+
+    def result(self):
+        metrics = {name: value / self.n_users if self.n_users else 0.0
+                   for name, value in self.sums.items()}
+        for k, mask in self.recommended.items():
+            metrics[f'coverage@{k}'] = float(mask.mean())
+        return metrics
+
+
+def as_engine(model, user_features=None, item_features=None):
+    """Wrap a bare LightFM model so every model exposes `predict_block`"""
+    if hasattr(model, 'predict_block'):
+        return model
+    return LightFMEngine.from_model(model, user_features, item_features)
+
+
+def _auto_block_size(n_items, max_cells=4_000_000):
+    return max(1, min(4096, max_cells // max(n_items, 1)))
+
+
+def _block_ranks(scores):
+    """Items ordered best-first, and the rank position (0 = best) of every item"""
+    order = np.argsort(-scores, axis=1)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(scores.shape[1])[None, :], axis=1)
+    return order, ranks
+
+
+def _unit_item_embeddings(engine):
+    """Row-normalised item embeddings for intra-list diversity (None if not dense)"""
+    _, embeddings = engine.item_representations()
+    if sparse.issparse(embeddings):
+        return None
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms > 0, norms, 1.0)
+
+
+def _accumulate_block(accumulator, positives, order, ranks, k_values, context=None):
+    """Add every ranking metric for one user block, derived from one ranking"""
+    positives = positives.toarray() > 0
+    n_positives = positives.sum(axis=1)
+    has_positives = n_positives > 0
+    if not has_positives.any():
+        return
+
+    positives = positives[has_positives]
+    order = order[has_positives]
+    ranks = ranks[has_positives]
+    n_positives = n_positives[has_positives]
+    n_items = ranks.shape[1]
+    context = context or {}
+
+    for k in k_values:
+        hits = (positives & (ranks < k)).sum(axis=1)
+        accumulator.add(f'precision@{k}', hits / k)
+        accumulator.add(f'recall@{k}', hits / n_positives)
+
+    # AUC from ranks: negatives ranked below each positive, over all pos/neg pairs
+    n_negatives = n_items - n_positives
+    below = np.where(positives, n_items - 1 - ranks, 0).sum(axis=1)
+    correct_pairs = below - n_positives * (n_positives - 1) / 2
+    auc = np.divide(correct_pairs, n_positives * n_negatives,
+                    out=np.ones(len(n_positives)), where=n_negatives > 0)
+    accumulator.add('auc', auc)
+
+    if context.get('extended'):
+        _accumulate_extended(accumulator, positives, order, ranks, n_positives, k_values, context)
+
+    accumulator.n_users += int(has_positives.sum())
+
+
+def _accumulate_extended(accumulator, positives, order, ranks, n_positives, k_values, context):
+    """NDCG, MAP, MRR, hit-rate, coverage, popularity and diversity from the same ranking"""
+    max_k = min(max(k_values), order.shape[1])
+    top_items = order[:, :max_k]
+    top_hits = np.take_along_axis(positives, top_items, axis=1).astype(np.float64)
+
+    discounts = 1.0 / np.log2(np.arange(2, max_k + 2))
+    ideal_dcg = np.concatenate([[0.0], np.cumsum(discounts)])
+    precision_at_rank = np.cumsum(top_hits, axis=1) / np.arange(1, max_k + 1)
+
+    # Reciprocal rank of the best-ranked positive over the full ranking
+    first_hit = np.where(positives, ranks, ranks.shape[1]).min(axis=1)
+    accumulator.add('mrr', 1.0 / (first_hit + 1))
+
+    popularity = context.get('popularity')
+    unit_embeddings = context.get('unit_embeddings')
+
+    for k in k_values:
+        depth = min(k, max_k)
+        hits_k = top_hits[:, :depth]
+
+        dcg = hits_k @ discounts[:depth]
+        accumulator.add(f'ndcg@{k}', dcg / ideal_dcg[np.minimum(n_positives, depth)])
+
+        average_precision = (hits_k * precision_at_rank[:, :depth]).sum(axis=1)
+        accumulator.add(f'map@{k}', average_precision / np.minimum(n_positives, depth))
+        accumulator.add(f'hit_rate@{k}', hits_k.any(axis=1))
+
+        accumulator.mark_recommended(k, top_items[:, :depth])
+
+        if popularity is not None:
+            accumulator.add(f'popularity@{k}', popularity[top_items[:, :depth]].mean(axis=1))
+
+        if unit_embeddings is not None and depth > 1:
+            # Mean pairwise cosine from ||sum e||^2 = k + sum_{i != j} cos(e_i, e_j)
+            summed = unit_embeddings[top_items[:, :depth]].sum(axis=1)
+            mean_similarity = ((summed ** 2).sum(axis=1) - depth) / (depth * (depth - 1))
+            accumulator.add(f'diversity@{k}', 1.0 - mean_similarity)
+
+
+def _evaluate_users(engine, matrices, users, k_values, block_size, context):
+    n_items = next(iter(matrices.values())).shape[1]
+    accumulators = {name: RankingAccumulator(n_items) for name in matrices}
+    for start in range(0, len(users), block_size):
+        block = users[start:start + block_size]
+        order, ranks = _block_ranks(engine.predict_block(block))
+        for name, matrix in matrices.items():
+            _accumulate_block(accumulators[name], matrix[block], order, ranks, k_values, context)
+    return accumulators
+
+
+def _resolve_n_jobs(n_jobs):
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    if n_jobs is None or n_jobs == 1:
+        return 1
+    if n_jobs < 0:
+        return max(1, cores + 1 + n_jobs)
+    return min(n_jobs, cores)
+
+
+def evaluate_ranking(model, interaction_sets, user_features=None, item_features=None,
+                     k_values=(5, 10, 20), block_size=None, extended=False,
+                     popularity_set='train', n_jobs=1):
+    """Score each user block once and derive every metric for every interaction set.
+
+    `interaction_sets` maps a name (e.g. 'train', 'test') to an interaction
+    matrix. Returns {name: {'precision@k': ..., 'recall@k': ..., 'auc': ...}},
+    matching the semantics of LightFM's precision_at_k/recall_at_k/auc_score
+    without train-item exclusion. With `extended=True` the same pass also adds
+    ndcg@k, map@k, mrr, hit_rate@k, coverage@k, popularity@k (mean share of
+    users who interacted with the recommended items in `popularity_set`) and
+    diversity@k (1 - mean pairwise cosine of the recommended item embeddings).
+
+    `n_jobs` > 1 (or -1 for all cores) partitions the users across a thread
+    pool. Scoring (BLAS matmul) and ranking (argsort) release the GIL, so the
+    shards run in parallel without forking a process that already runs
+    OpenMP/BLAS threads; each shard returns accumulators that are merged here.
+    """
+    engine = as_engine(model, user_features, item_features)
+    matrices = {name: sparse.csr_matrix(m) for name, m in interaction_sets.items()}
+    n_users, n_items = next(iter(matrices.values())).shape
+
+    active = np.zeros(n_users, dtype=bool)
+    for matrix in matrices.values():
+        active |= np.diff(matrix.indptr) > 0
+    users = np.where(active)[0]
+
+    context = {'extended': extended}
+    if extended:
+        reference = matrices.get(popularity_set, next(iter(matrices.values())))
+        context['popularity'] = np.bincount(reference.indices, minlength=n_items) / n_users
+        context['unit_embeddings'] = _unit_item_embeddings(engine)
+
+    block_size = block_size or _auto_block_size(n_items)
+    n_jobs = _resolve_n_jobs(n_jobs)
+
+    if n_jobs == 1:
+        accumulators = _evaluate_users(engine, matrices, users, k_values, block_size, context)
+    else:
+        # Resolve cached representations once so the shards don't race to build them
+        engine.user_representations()
+        engine.item_representations()
+        shards = np.array_split(users, n_jobs)
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            shard_results = list(pool.map(
+                lambda shard: _evaluate_users(engine, matrices, shard, k_values, block_size, context),
+                shards
+            ))
+
+        accumulators = shard_results[0]
+        for shard in shard_results[1:]:
+            for name, accumulator in shard.items():
+                accumulators[name].merge(accumulator)
+
+    return {name: accumulator.result() for name, accumulator in accumulators.items()}
+
+"""## SAMPLED-NEGATIVE EVALUATION"""
+
+def _sample_negatives(rng, users, n_items, n_negatives, positive_keys, max_rounds=10):
+    """Uniform negatives per positive; items the user interacted with are resampled.
+
+    Returns the (n, n_negatives) item matrix and a mask of valid samples
+    (collisions still left after `max_rounds` are masked out).
+    """
+    negatives = rng.integers(0, n_items, size=(len(users), n_negatives))
+    keys = users[:, None].astype(np.int64) * n_items + negatives
+    collisions = np.isin(keys, positive_keys)
+    for _ in range(max_rounds):
+        if not collisions.any():
+            break
+        negatives[collisions] = rng.integers(0, n_items, size=collisions.sum())
+        keys = users[:, None].astype(np.int64) * n_items + negatives
+        collisions = np.isin(keys, positive_keys)
+    return negatives, ~collisions
+
+
+def evaluate_sampled(model, interactions, user_features=None, item_features=None,
+                     n_negatives=100, k_values=(5, 10, 20), exclude_interactions=None,
+                     seed=42, chunk_cells=4_000_000):
+    """AUC, hit-rate@k and NDCG@k estimated against sampled negatives.
+
+    Every positive is scored against `n_negatives` uniformly sampled items the
+    user did not interact with (also excluding `exclude_interactions`, e.g.
+    the train set), so cost is O(positives x n_negatives) instead of
+    O(users x items). Metrics are averaged per user, then over users, and
+    reported with their standard error. The fixed `seed` makes runs comparable.
+    """
+    engine = as_engine(model, user_features, item_features)
+    interactions = sparse.csr_matrix(interactions)
+    n_users, n_items = interactions.shape
+    rng = np.random.default_rng(seed)
+
+    coo = interactions.tocoo()
+    users, items = coo.row.astype(np.int64), coo.col.astype(np.int64)
+    keep = coo.data > 0
+    users, items = users[keep], items[keep]
+
+    known = users * n_items + items
+    if exclude_interactions is not None:
+        excluded = sparse.coo_matrix(exclude_interactions)
+        known = np.concatenate([known, excluded.row.astype(np.int64) * n_items + excluded.col])
+    positive_keys = np.unique(known)
+
+    per_positive = {'auc': [], **{f'hit_rate@{k}': [] for k in k_values},
+                    **{f'ndcg@{k}': [] for k in k_values}}
+    chunk = max(1, chunk_cells // (n_negatives + 1))
+
+    for start in range(0, len(users), chunk):
+        chunk_users, chunk_items = users[start:start + chunk], items[start:start + chunk]
+        negatives, valid = _sample_negatives(rng, chunk_users, n_items, n_negatives, positive_keys)
+
+        positive_scores = engine.predict(chunk_users, chunk_items)
+        negative_scores = engine.predict(
+            np.repeat(chunk_users, n_negatives), negatives.ravel()
+        ).reshape(negatives.shape)
+
+        higher = ((negative_scores > positive_scores[:, None]) & valid).sum(axis=1)
+        ties = ((negative_scores == positive_scores[:, None]) & valid).sum(axis=1)
+        n_valid = np.maximum(valid.sum(axis=1), 1)
+
+        per_positive['auc'].append(1.0 - (higher + 0.5 * ties) / n_valid)
+        # Sampled rank of the positive among its negatives (0 = best)
+        for k in k_values:
+            per_positive[f'hit_rate@{k}'].append(higher < k)
+            per_positive[f'ndcg@{k}'].append(np.where(higher < k, 1.0 / np.log2(higher + 2), 0.0))
+
+    results = {'n_negatives': n_negatives, 'n_positives': int(len(users))}
+    if len(users) == 0:
+        return results
+
+    # Average per user first so heavy users don't dominate, then over users
+    user_counts = np.bincount(users, minlength=n_users)
+    evaluated = user_counts > 0
+    results['n_users'] = int(evaluated.sum())
+    for name, chunks in per_positive.items():
+        values = np.concatenate(chunks).astype(np.float64)
+        per_user = np.bincount(users, weights=values, minlength=n_users)[evaluated] / user_counts[evaluated]
+        results[name] = float(per_user.mean())
+        results[f'{name}_stderr'] = float(per_user.std(ddof=1) / np.sqrt(len(per_user))) if len(per_user) > 1 else 0.0
+    return results
+
 """## COMPREHENSIVE MODEL EVALUATION"""
 
 def evaluate_model(model, train_interactions, test_interactions,
-                   user_features, item_features, k_values=[5, 10, 20]):
+                   user_features, item_features, k_values=[5, 10, 20], block_size=None,
+                   extended=True, n_jobs=1, n_negatives=None, seed=42):
     """Comprehensive model evaluation with comparison metrics"""
     print("\n" + "=" * 80)
     print("STEP 7: COMPREHENSIVE MODEL EVALUATION")
@@ -20,15 +327,19 @@ def evaluate_model(model, train_interactions, test_interactions,
 
     results = {}
 
+    # One scoring and ranking pass yields every metric below
+    ranking = evaluate_ranking(
+        model, {'train': train_interactions, 'test': test_interactions},
+        user_features=user_features, item_features=item_features,
+        k_values=k_values, block_size=block_size, extended=extended,
+        n_jobs=n_jobs
+    )
+
     print("\n PRECISION & RECALL METRICS:")
     print("-" * 80)
     for k in k_values:
-        test_precision = precision_at_k(model, test_interactions,
-                                       user_features=user_features,
-                                       item_features=item_features, k=k).mean()
-        test_recall = recall_at_k(model, test_interactions,
-                                 user_features=user_features,
-                                 item_features=item_features, k=k).mean()
+        test_precision = ranking['test'][f'precision@{k}']
+        test_recall = ranking['test'][f'recall@{k}']
 
         results[f'precision@{k}'] = test_precision
         results[f'recall@{k}'] = test_recall
@@ -38,12 +349,8 @@ def evaluate_model(model, train_interactions, test_interactions,
     # AUC Score
     print("\n AUC SCORES:")
     print("-" * 80)
-    train_auc = auc_score(model, train_interactions,
-                         user_features=user_features,
-                         item_features=item_features).mean()
-    test_auc = auc_score(model, test_interactions,
-                        user_features=user_features,
-                        item_features=item_features).mean()
+    train_auc = ranking['train']['auc']
+    test_auc = ranking['test']['auc']
 
     overfitting_gap = train_auc - test_auc
 
@@ -55,6 +362,34 @@ def evaluate_model(model, train_interactions, test_interactions,
     print(f"  Test AUC:  {test_auc:.4f}")
     print(f"  Overfitting Gap: {overfitting_gap:.4f}")
 
+    if n_negatives:
+        print(f"\n SAMPLED-NEGATIVE ESTIMATES ({n_negatives} negatives per positive):")
+        print("-" * 80)
+        sampled = evaluate_sampled(model, test_interactions, user_features, item_features,
+                                   n_negatives=n_negatives, k_values=k_values,
+                                   exclude_interactions=train_interactions, seed=seed)
+        results.update({f'sampled_{name}': value for name, value in sampled.items()})
+        print(f"  Sampled Test AUC: {sampled['auc']:.4f} ± {sampled['auc_stderr']:.4f}")
+        for k in k_values:
+            print(f"  Sampled Hit-rate@{k}: {sampled[f'hit_rate@{k}']:.4f} ± {sampled[f'hit_rate@{k}_stderr']:.4f} | "
+                  f"Sampled NDCG@{k}: {sampled[f'ndcg@{k}']:.4f} ± {sampled[f'ndcg@{k}_stderr']:.4f}")
+
+    if extended:
+        print("\n RANKING QUALITY & CATALOG METRICS:")
+        print("-" * 80)
+        test_ranking = ranking['test']
+        results['mrr'] = test_ranking['mrr']
+        print(f"  MRR: {test_ranking['mrr']:.4f}")
+        for k in k_values:
+            for metric in ('ndcg', 'map', 'hit_rate', 'coverage', 'popularity', 'diversity'):
+                if f'{metric}@{k}' in test_ranking:
+                    results[f'{metric}@{k}'] = test_ranking[f'{metric}@{k}']
+            print(f"  NDCG@{k}: {test_ranking[f'ndcg@{k}']:.4f} | MAP@{k}: {test_ranking[f'map@{k}']:.4f} | "
+                  f"Hit-rate@{k}: {test_ranking[f'hit_rate@{k}']:.4f}")
+            print(f"  Coverage@{k}: {test_ranking[f'coverage@{k}']:.2%} | "
+                  f"Popularity@{k}: {test_ranking.get(f'popularity@{k}', float('nan')):.4f} | "
+                  f"Diversity@{k}: {test_ranking.get(f'diversity@{k}', float('nan')):.4f}")
+
     # Interpretation
     print("\n PERFORMANCE INTERPRETATION:")
     print("-" * 80)
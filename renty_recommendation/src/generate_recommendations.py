@@ -13,7 +13,11 @@ Original file is located at
 
 def get_recommendations(model, user_id, dataset, user_features, item_features,
                        df, n_recommendations=10, filter_already_purchased=True):
-    """Generate top-N recommendations for a specific user"""
+    """Generate top-N recommendations for a specific user.
+
+    `model` can be a LightFM model or any training engine (lightfm/als/bpr),
+    since they all share LightFM's `predict` signature.
+    """
 
     # Get mappings
     user_id_map, user_feature_map, item_id_map, item_feature_map = dataset.mapping()
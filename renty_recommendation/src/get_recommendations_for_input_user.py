@@ -11,7 +11,9 @@ Original file is located at
 
 """## Load the saved model and artifacts"""
 
+import os
 import pickle
+import time
 
 def load_model_artifacts(filepath='renty_lightfm_model_artifacts.pkl'):
     """Loads the LightFM model and associated artifacts from a pickle file."""
@@ -21,18 +23,48 @@ def load_model_artifacts(filepath='renty_lightfm_model_artifacts.pkl'):
     return artifacts['model'], artifacts['dataset'], artifacts['user_features'], artifacts['item_features']
 
 
-loaded_model, loaded_dataset, loaded_user_features, loaded_item_features = load_model_artifacts(filepath='renty_lightfm_model_artifacts.pkl')
+def load_recommender(filepath='renty_lightfm_model_artifacts.pkl',
+                     fallback_filepath='renty_item_similarity.npz', max_age_days=None):
+    """Load the LightFM artifacts, falling back to the item-item model when they
+    are missing or older than `max_age_days`.
+
+    Returns the same (model, dataset, user_features, item_features) tuple in both
+    cases, so `get_recommendations` serves either one unchanged.
+    """
+    stale = False
+    if os.path.exists(filepath) and max_age_days is not None:
+        age_days = (time.time() - os.path.getmtime(filepath)) / 86400
+        stale = age_days > max_age_days
+
+    if os.path.exists(filepath) and not stale:
+        return load_model_artifacts(filepath)
+
+    reason = 'stale' if stale else 'missing'
+    print(f"LightFM artifact {filepath} is {reason}; serving the item-item fallback model")
+    engine = ItemItemEngine.load(fallback_filepath)
+    return engine, engine.mapping, None, None
+
+
+# Serve the item-item fallback once the LightFM artifact is older than this
+MAX_ARTIFACT_AGE_DAYS = 30
+
+loaded_model, loaded_dataset, loaded_user_features, loaded_item_features = load_recommender(
+    filepath='renty_lightfm_model_artifacts.pkl',
+    fallback_filepath='renty_item_similarity.npz',
+    max_age_days=MAX_ARTIFACT_AGE_DAYS
+)
 
 print("Model and artifacts loaded successfully!")
 
 def get_recommendations_for_input_user(user_id_input, model, dataset, user_features, item_features, df, n_recommendations=10):
     """
-    Takes a user ID input and provides recommendations using the loaded LightFM model.
+    Takes a user ID input and provides recommendations using the loaded model
+    (LightFM, or the item-item fallback).
 
     Args:
         user_id_input: The CustomerKey of the user for whom to generate recommendations.
-        model: The trained LightFM model.
-        dataset: The LightFM Dataset object.
+        model: The trained LightFM model or training engine.
+        dataset: The LightFM Dataset object (or any object exposing `mapping()`).
         user_features: The user features matrix.
         item_features: The item features matrix.
         df: The original pandas DataFrame containing user purchase history.
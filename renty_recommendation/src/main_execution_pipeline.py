@@ -11,80 +11,44 @@ Original file is located at
 
 """# MAIN EXECUTION PIPELINE"""
 
-def main(filepath):
-    """Execute complete improved recommendation system pipeline"""
-
-    print(" INITIATING IMPROVED LIGHTFM RECOMMENDER SYSTEM")
-    print("=" * 80)
-
-    # Step 1: Load and preprocess data
-    df = load_and_preprocess_data(filepath)
-
-    # Step 2: Advanced feature engineering
-    df = engineer_features(df)
-
-    # Step 3: Text feature extraction
-    df, text_feature_cols = extract_text_features(df, max_features=50)
-
-    # Step 4: Prepare LightFM data
-    dataset, user_features, item_features = prepare_lightfm_data(df, text_feature_cols)
-
-    # Step 5: Create train/test splits
-    train_interactions, test_interactions, train_weights, test_weights = \
-        create_interaction_matrices(df, dataset)
-
-    # Step 6: Hyperparameter tuning with regularization
-    best_params, results_df = extended_hyperparameter_search(
-        train_interactions, test_interactions,
-        user_features, item_features, train_weights
-    )
-
-    # Train final model with best parameters
-    print("\n" + "=" * 80)
-    print(" TRAINING FINAL MODEL WITH OPTIMIZED PARAMETERS")
-    print("=" * 80)
-
-    final_model = train_lightfm_model(
-        train_interactions, user_features, item_features,
-        train_weights=train_weights,
-        loss=best_params['loss'],
-        no_components=best_params['no_components'],
-        learning_rate=best_params['learning_rate'],
-        item_alpha=best_params['item_alpha'],
-        user_alpha=best_params['user_alpha'],
-        epochs=60,
-        num_threads=4,
-        verbose=True
-    )
-
-    # Step 7: Comprehensive evaluation
-    evaluation_results = evaluate_model(
-        final_model, train_interactions, test_interactions,
-        user_features, item_features
-    )
-
-    # Step 8: Generate recommendations - FIXED: pass final_model explicitly
-    display_user_recommendations(
-        df, final_model, dataset, user_features, item_features,
-        n_recommendations=10
+def main(filepath, cache_dir='renty_cache', use_cache=True, feature_hash_buckets=None,
+         telemetry_path=None, eval_n_jobs=1, backtest=False,
+         benchmark_path='renty_benchmarks.jsonl', benchmark_window=5,
+         headless=False, plot_dir='renty_plots', profile_path=None, profile_memory=False,
+         sample_stacks=False):
+    """Execute complete improved recommendation system pipeline.
+
+    Thin wrapper over `run_recommendation_dag`: every step's outputs are
+    checkpointed in `cache_dir` by a hash of its inputs, parameters and code,
+    so reruns with unchanged data skip straight to the steps that changed.
+    Set `feature_hash_buckets` to bound the LightFM feature dimensionality and
+    `telemetry_path` to export per-epoch training telemetry as JSON, and
+    `eval_n_jobs` to shard the evaluation across threads. `backtest=True`
+    also runs the rolling-origin temporal backtest with the best parameters.
+    Each run is appended to the benchmark store at `benchmark_path` and
+    compared against the last `benchmark_window` runs. With `headless=True`
+    charts are rendered to `plot_dir` by background workers instead of shown.
+    `profile_path` exports the per-step timing profile as JSON, with peak
+    traced memory when `profile_memory=True` (tracing slows the steps down);
+    `sample_stacks=True` also dumps collapsed stacks for the slowest step.
+    """
+    return run_recommendation_dag(
+        filepath,
+        checkpoint_dir=cache_dir,
+        resume=use_cache,
+        telemetry_path=telemetry_path,
+        profile_path=profile_path,
+        profile_memory=profile_memory,
+        sample_stacks=sample_stacks,
+        feature_hash_buckets=feature_hash_buckets,
+        eval_n_jobs=eval_n_jobs,
+        backtest=backtest,
+        benchmark_path=benchmark_path,
+        benchmark_window=benchmark_window,
+        headless=headless,
+        plot_dir=plot_dir,
     )
 
-    # Step 9: Visualization and analysis
-    baseline_results = {
-        'precision@5': 0.15, 'precision@10': 0.12, 'precision@20': 0.08,
-        'recall@5': 0.08, 'recall@10': 0.15, 'recall@20': 0.22,
-        'train_auc': 0.92, 'test_auc': 0.75, 'overfitting_gap': 0.17
-    }
-
-    plot_comparison_results(baseline_results, evaluation_results)
-    plot_hyperparameter_analysis(results_df)
-
-    print("\n" + "=" * 80)
-    print(" IMPROVED RECOMMENDER SYSTEM PIPELINE COMPLETED!")
-    print("=" * 80)
-
-    return final_model, dataset, user_features, item_features, df, evaluation_results
-
 
 # ============================================================================
 # EXECUTE THE IMPROVED PIPELINE
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""ITEM_SIMILARITY_MODEL
+
+Sparse co-occurrence item-to-item recommender.
+
+Built from the interaction matrix with a single sparse product (Xᵀ·X),
+normalised with cosine or Jaccard similarity and pruned to the top-k
+neighbours per item. No embeddings are trained, so it fits in seconds and
+serves as the fallback engine when the LightFM artifact is missing or stale.
+"""
+
+import numpy as np
+from scipy import sparse
+
+"""## ITEM-ITEM ENGINE"""
+
+class InteractionMapping:
+    """Minimal stand-in for `lightfm.data.Dataset.mapping()` used when serving
+    without the LightFM artifact"""
+
+    def __init__(self, user_ids, item_ids):
+        self.user_id_map = {user_id: i for i, user_id in enumerate(user_ids)}
+        self.item_id_map = {item_id: i for i, item_id in enumerate(item_ids)}
+
+    def mapping(self):
+        return self.user_id_map, {}, self.item_id_map, {}
+
+
+class ItemItemEngine:
+    """Item-to-item co-occurrence model with the training engine interface"""
+
+    name = 'itemitem'
+    iterative = False  # a single pass builds the model; there are no epochs
+
+    def __init__(self, similarity='cosine', top_k=50):
+        if similarity not in ('cosine', 'jaccard'):
+            raise ValueError(f"Unsupported similarity: {similarity}")
+        self.similarity = similarity
+        self.top_k = top_k
+        self.user_items = None
+        self.similarity_matrix = None
+        self.mapping = None
+
+    def fit(self, interactions, user_features=None, item_features=None,
+            sample_weight=None, epochs=None, num_threads=None, verbose=False):
+        """Build the pruned item-item similarity matrix (features and epochs are ignored)"""
+        user_items = sparse.csr_matrix(sample_weight if sample_weight is not None else interactions,
+                                       dtype=np.float32)
+        self.user_items = user_items
+        self.similarity_matrix = item_similarity_matrix(
+            user_items, similarity=self.similarity, top_k=self.top_k
+        )
+        self._similarity_t = self.similarity_matrix.T.tocsr()
+
+        if verbose:
+            print(f"Item-item similarity: {self.similarity_matrix.shape}, "
+                  f"{self.similarity_matrix.nnz} neighbours (top {self.top_k} per item)")
+        return self
+
+    def partial_fit(self, interactions, user_features=None, item_features=None,
+                    sample_weight=None, epochs=None, num_threads=None, verbose=False):
+        """Fold new interactions into the history and rebuild the similarities"""
+        new_items = sparse.csr_matrix(sample_weight if sample_weight is not None else interactions,
+                                      dtype=np.float32)
+        if self.user_items is not None:
+            new_items = self.user_items + new_items
+        return self.fit(new_items, verbose=verbose)
+
+    def user_representations(self):
+        """Users are represented by their (sparse) interaction history"""
+        return np.zeros(self.user_items.shape[0], dtype=np.float32), self.user_items
+
+    def item_representations(self):
+        """Items are represented by their (sparse) similarity column"""
+        return np.zeros(self._similarity_t.shape[0], dtype=np.float32), self._similarity_t
+
+    def predict(self, user_ids, item_ids, user_features=None, item_features=None,
+                num_threads=1):
+        user_ids, item_ids = np.broadcast_arrays(np.asarray(user_ids), np.asarray(item_ids))
+        scores = self.user_items[user_ids].multiply(self._similarity_t[item_ids]).sum(axis=1)
+        return np.asarray(scores, dtype=np.float32).ravel()
+
+    def predict_block(self, user_ids, item_ids=None):
+        scores = (self.user_items[user_ids] @ self.similarity_matrix).toarray()
+        if item_ids is not None:
+            scores = scores[:, item_ids]
+        return scores
+
+    # ===== PERSISTENCE (CSR) =====
+
+    def save(self, filepath='renty_item_similarity.npz', dataset=None):
+        """Persist similarity and history as CSR arrays, plus the external id mapping"""
+        mapping = dataset if dataset is not None else self.mapping
+        arrays = {
+            'similarity': np.array(self.similarity),
+            'top_k': np.array(self.top_k),
+        }
+        for prefix, matrix in (('sim', self.similarity_matrix), ('hist', self.user_items)):
+            arrays[f'{prefix}_data'] = matrix.data
+            arrays[f'{prefix}_indices'] = matrix.indices
+            arrays[f'{prefix}_indptr'] = matrix.indptr
+            arrays[f'{prefix}_shape'] = np.array(matrix.shape)
+
+        if mapping is not None:
+            user_id_map, _, item_id_map, _ = mapping.mapping()
+            arrays['user_ids'] = np.array(sorted(user_id_map, key=user_id_map.get))
+            arrays['item_ids'] = np.array(sorted(item_id_map, key=item_id_map.get))
+
+        np.savez_compressed(filepath, **arrays)
+        print(f"Item-item model saved successfully to {filepath}")
+
+    @classmethod
+    def load(cls, filepath='renty_item_similarity.npz'):
+        with np.load(filepath, allow_pickle=False) as stored:
+            engine = cls(similarity=str(stored['similarity']), top_k=int(stored['top_k']))
+            matrices = {}
+            for prefix in ('sim', 'hist'):
+                matrices[prefix] = sparse.csr_matrix(
+                    (stored[f'{prefix}_data'], stored[f'{prefix}_indices'], stored[f'{prefix}_indptr']),
+                    shape=tuple(stored[f'{prefix}_shape'])
+                )
+            if 'user_ids' in stored:
+                engine.mapping = InteractionMapping(stored['user_ids'].tolist(),
+                                                    stored['item_ids'].tolist())
+
+        engine.similarity_matrix = matrices['sim']
+        engine._similarity_t = engine.similarity_matrix.T.tocsr()
+        engine.user_items = matrices['hist']
+        print(f"Item-item model loaded successfully from {filepath}")
+        return engine
+
+
+def item_similarity_matrix(user_items, similarity='cosine', top_k=50):
+    """Co-occurrence similarity Xᵀ·X, normalised and pruned to top_k per row"""
+    binary = user_items.copy()
+    binary.data = np.ones_like(binary.data)
+
+    co_occurrence = (binary.T @ binary).tocoo()
+    item_counts = np.asarray(binary.sum(axis=0)).ravel()
+
+    rows, cols, counts = co_occurrence.row, co_occurrence.col, co_occurrence.data
+    off_diagonal = rows != cols
+    rows, cols, counts = rows[off_diagonal], cols[off_diagonal], counts[off_diagonal]
+
+    if similarity == 'cosine':
+        values = counts / np.sqrt(item_counts[rows] * item_counts[cols])
+    else:
+        values = counts / (item_counts[rows] + item_counts[cols] - counts)
+
+    # Keep the top_k strongest neighbours per item: sort by (row, -value)
+    # and drop everything past the k-th position within each row
+    order = np.lexsort((-values, rows))
+    rows, cols, values = rows[order], cols[order], values[order]
+    row_starts = np.searchsorted(rows, rows, side='left')
+    keep = (np.arange(len(rows)) - row_starts) < top_k
+
+    n_items = user_items.shape[1]
+    return sparse.csr_matrix(
+        (values[keep].astype(np.float32), (rows[keep], cols[keep])),
+        shape=(n_items, n_items)
+    )
+
+
+def build_item_similarity_fallback(df, dataset, similarity='cosine', top_k=50,
+                                   filepath='renty_item_similarity.npz'):
+    """Fit the item-item model on the full purchase history and persist it"""
+    user_id_map, _, item_id_map, _ = dataset.mapping()
+    user_index = df['CustomerKey'].map(user_id_map).to_numpy()
+    item_index = df['ProductKey'].map(item_id_map).to_numpy()
+
+    history = sparse.csr_matrix(
+        (df['OrderQuantity'].to_numpy(dtype=np.float32), (user_index, item_index)),
+        shape=(len(user_id_map), len(item_id_map))
+    )
+
+    engine = ItemItemEngine(similarity=similarity, top_k=top_k).fit(history, verbose=True)
+    engine.save(filepath, dataset=dataset)
+    return engine
@@ -23,16 +23,20 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder, MinMaxScaler
 from sklearn.feature_extraction.text import TfidfVectorizer
 import itertools
+import time
+import zlib
+from collections import Counter
 import warnings
 warnings.filterwarnings('ignore')
 
 """##  TEXT FEATURE EXTRACTION WITH TF-IDF"""
 
-def extract_text_features(df, max_features=50):
+def extract_text_features(df, max_features=50, verbose=True):
     """Extract TF-IDF features from product descriptions"""
-    print("\n" + "=" * 80)
-    print("STEP 3: TEXT FEATURE EXTRACTION (TF-IDF)")
-    print("=" * 80)
+    if verbose:
+        print("\n" + "=" * 80)
+        print("STEP 3: TEXT FEATURE EXTRACTION (TF-IDF)")
+        print("=" * 80)
 
     # Get unique products with descriptions
     unique_products = df.groupby('ProductKey')['ProductDescription'].first().reset_index()
@@ -53,27 +57,70 @@ def extract_text_features(df, max_features=50):
     # Merge back to main dataframe
     df = df.merge(text_features_df, on='ProductKey', how='left')
 
-    print(f"Extracted {max_features} TF-IDF features from product descriptions")
-    print(f"Top terms: {list(tfidf.get_feature_names_out()[:10])}")
+    if verbose:
+        print(f"Extracted {max_features} TF-IDF features from product descriptions")
+        print(f"Top terms: {list(tfidf.get_feature_names_out()[:10])}")
 
     return df, list(text_features_df.columns[:-1])
 
+"""## FEATURE HASHING"""
+
+def feature_collision_report(tokens, n_buckets):
+    """Summarise how distinct feature tokens collide when hashed into n_buckets"""
+    tokens = set(tokens)
+    bucket_sizes = Counter(_feature_bucket(token, n_buckets) for token in tokens)
+    colliding_tokens = sum(size for size in bucket_sizes.values() if size > 1)
+
+    return {
+        'distinct_tokens': len(tokens),
+        'buckets': n_buckets,
+        'buckets_used': len(bucket_sizes),
+        'colliding_tokens': colliding_tokens,
+        'collision_rate': colliding_tokens / len(tokens) if tokens else 0.0,
+        'max_tokens_per_bucket': max(bucket_sizes.values(), default=0),
+    }
+
+
+def _feature_bucket(token, n_buckets):
+    # crc32 instead of hash(): Python's string hash is salted per process
+    return zlib.crc32(str(token).encode('utf-8')) % n_buckets
+
+
+def hash_feature_tuples(feature_tuples, n_buckets, prefix):
+    """Replace feature tokens with a fixed set of hashed bucket features.
+
+    Tokens landing in the same bucket for one entity add up their weights.
+    """
+    hashed_tuples = []
+    for key, features in feature_tuples:
+        buckets = Counter(f"{prefix}_hash_{_feature_bucket(token, n_buckets)}" for token in features)
+        hashed_tuples.append((key, dict(buckets)))
+
+    bucket_names = [f"{prefix}_hash_{i}" for i in range(n_buckets)]
+    return hashed_tuples, bucket_names
+
 """## PREPARE DATA FOR LIGHTFM (IMPROVED)"""
 
-def prepare_lightfm_data(df, text_feature_cols):
-    """Prepare comprehensive interaction and feature matrices for LightFM"""
+def prepare_lightfm_data(df, text_feature_cols, feature_hash_buckets=None):
+    """Prepare comprehensive interaction and feature matrices for LightFM.
+
+    With `feature_hash_buckets` set (an int, or a (user, item) pair), feature
+    tokens are hashed into that many buckets so the feature matrices keep a
+    fixed width no matter how many distinct attribute values appear.
+    """
     print("\n" + "=" * 80)
     print("STEP 4: PREPARING ENHANCED DATA FOR LIGHTFM")
     print("=" * 80)
 
-    dataset = Dataset()
-
-    # Fit the dataset with users and items
-    dataset.fit(
-        users=df['CustomerKey'].unique(),
-        items=df['ProductKey'].unique()
+    user_feature_tuples, item_feature_tuples = lightfm_feature_tuples(df, text_feature_cols)
+    return fit_lightfm_dataset(
+        df['CustomerKey'].unique(), df['ProductKey'].unique(),
+        user_feature_tuples, item_feature_tuples, feature_hash_buckets=feature_hash_buckets
     )
 
+
+def lightfm_feature_tuples(df, text_feature_cols):
+    """(key, feature tokens) pairs for every customer and every product in `df`"""
     # ===== COMPREHENSIVE USER FEATURES =====
     user_features_list = [
         'Gender', 'MaritalStatus', 'EducationLevel', 'Occupation',
@@ -109,13 +156,42 @@ def prepare_lightfm_data(df, text_feature_cols):
 
         item_feature_tuples.append((product_key, features))
 
+    return user_feature_tuples, item_feature_tuples
+
+
+def fit_lightfm_dataset(users, items, user_feature_tuples, item_feature_tuples,
+                        feature_hash_buckets=None, verbose=True):
+    """Fit a Dataset on `users`/`items` and their feature tuples and build the feature matrices"""
+    dataset = Dataset()
+
+    # Fit the dataset with users and items
+    dataset.fit(users=users, items=items)
+
     # Fit features
     all_user_features = [f for _, feats in user_feature_tuples for f in feats]
     all_item_features = [f for _, feats in item_feature_tuples for f in feats]
 
+    if feature_hash_buckets is not None:
+        if isinstance(feature_hash_buckets, int):
+            feature_hash_buckets = (feature_hash_buckets, feature_hash_buckets)
+        n_user_buckets, n_item_buckets = feature_hash_buckets
+
+        if verbose:
+            for label, tokens, n_buckets in (('User', all_user_features, n_user_buckets),
+                                             ('Item', all_item_features, n_item_buckets)):
+                report = feature_collision_report(tokens, n_buckets)
+                print(f"{label} feature hashing: {report['distinct_tokens']} tokens -> "
+                      f"{report['buckets_used']}/{report['buckets']} buckets, "
+                      f"collision rate: {report['collision_rate']:.2%}")
+
+        user_feature_tuples, all_user_features = hash_feature_tuples(
+            user_feature_tuples, n_user_buckets, 'user')
+        item_feature_tuples, all_item_features = hash_feature_tuples(
+            item_feature_tuples, n_item_buckets, 'item')
+
     dataset.fit_partial(
-        users=df['CustomerKey'].unique(),
-        items=df['ProductKey'].unique(),
+        users=users,
+        items=items,
         user_features=all_user_features,
         item_features=all_item_features
     )
@@ -124,14 +200,35 @@ def prepare_lightfm_data(df, text_feature_cols):
     user_features_matrix = dataset.build_user_features(user_feature_tuples)
     item_features_matrix = dataset.build_item_features(item_feature_tuples)
 
-    print(f"User features matrix shape: {user_features_matrix.shape}")
-    print(f"Item features matrix shape: {item_features_matrix.shape}")
-    print(f"Total user features: {len(set(all_user_features))}")
-    print(f"Total item features: {len(set(all_item_features))}")
+    if verbose:
+        print(f"User features matrix shape: {user_features_matrix.shape}")
+        print(f"Item features matrix shape: {item_features_matrix.shape}")
+        print(f"Total user features: {len(set(all_user_features))}")
+        print(f"Total item features: {len(set(all_item_features))}")
 
     return dataset, user_features_matrix, item_features_matrix
 
 
+def build_interaction_matrices(frame, dataset):
+    """Vectorized equivalent of `dataset.build_interactions` over a purchase frame.
+
+    Returns the same (interactions, weights) COO pair, with one unsummed entry
+    per row, without iterating rows in Python.
+    """
+    user_id_map, _, item_id_map, _ = dataset.mapping()
+    shape = (len(user_id_map), len(item_id_map))
+    rows = frame['CustomerKey'].map(user_id_map).to_numpy(dtype=np.int32)
+    cols = frame['ProductKey'].map(item_id_map).to_numpy(dtype=np.int32)
+
+    interactions = sparse.coo_matrix(
+        (np.ones(len(frame), dtype=np.int32), (rows, cols)), shape=shape
+    )
+    weights = sparse.coo_matrix(
+        (frame['OrderQuantity'].to_numpy(dtype=np.float32), (rows, cols)), shape=shape
+    )
+    return interactions, weights
+
+
 def create_interaction_matrices(df, dataset):
     """Create train and test interaction matrices with temporal split"""
     print("\n" + "=" * 80)
@@ -146,15 +243,8 @@ def create_interaction_matrices(df, dataset):
     test_df = df_sorted.iloc[split_idx:]
 
     # Build interaction matrices with weights
-    train_interactions, train_weights = dataset.build_interactions(
-        [(row['CustomerKey'], row['ProductKey'], row['OrderQuantity'])
-         for _, row in train_df.iterrows()]
-    )
-
-    test_interactions, test_weights = dataset.build_interactions(
-        [(row['CustomerKey'], row['ProductKey'], row['OrderQuantity'])
-         for _, row in test_df.iterrows()]
-    )
+    train_interactions, train_weights = build_interaction_matrices(train_df, dataset)
+    test_interactions, test_weights = build_interaction_matrices(test_df, dataset)
 
     print(f"Train interactions: {train_interactions.shape}, density: {train_interactions.nnz / np.prod(train_interactions.shape):.6f}")
     print(f"Test interactions: {test_interactions.shape}, density: {test_interactions.nnz / np.prod(test_interactions.shape):.6f}")
@@ -164,36 +254,84 @@ def create_interaction_matrices(df, dataset):
 
 """## ADVANCED MODEL TRAINING WITH REGULARIZATION"""
 
+def train_model(train_interactions, user_features, item_features,
+                train_weights=None, engine='lightfm', epochs=50, num_threads=4,
+                verbose=True, telemetry=None, telemetry_label=None,
+                eval_fn=None, eval_every=5, **engine_params):
+    """Train any registered engine (lightfm, als, bpr) on the shared interaction matrices.
+
+    With a `TrainingTelemetry` recorder, training runs one epoch at a time so
+    per-epoch wall/CPU time and throughput can be recorded; `eval_fn(engine)`
+    is called every `eval_every` epochs to build the metric trajectory.
+    """
+
+    trained_engine = make_engine(engine, **engine_params)
+    fit_kwargs = dict(
+        user_features=user_features,
+        item_features=item_features,
+        sample_weight=train_weights,
+        num_threads=num_threads,
+        verbose=verbose
+    )
+
+    if telemetry is None:
+        trained_engine.fit(train_interactions, epochs=epochs, **fit_kwargs)
+        return trained_engine
+
+    telemetry.start_run(telemetry_label or engine, n_interactions=train_interactions.nnz,
+                        num_threads=num_threads, params=engine_params)
+    n_epochs = epochs if getattr(trained_engine, 'iterative', True) else 1
+
+    for epoch in range(n_epochs):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if epoch == 0:
+            trained_engine.fit(train_interactions, epochs=1, **fit_kwargs)
+        else:
+            trained_engine.partial_fit(train_interactions, epochs=1, **fit_kwargs)
+        wall_seconds = time.perf_counter() - wall_start
+        cpu_seconds = time.process_time() - cpu_start
+
+        metrics = None
+        if eval_fn is not None and ((epoch + 1) % eval_every == 0 or epoch + 1 == n_epochs):
+            metrics = eval_fn(trained_engine)
+        telemetry.record_epoch(epoch + 1, wall_seconds, cpu_seconds, metrics)
+
+    telemetry.finish_run()
+    return trained_engine
+
+
 def train_lightfm_model(train_interactions, user_features, item_features,
                         train_weights=None, loss='warp', no_components=50,
                         learning_rate=0.05, item_alpha=0.0001, user_alpha=0.0001,
-                        epochs=50, num_threads=4, verbose=True):
+                        epochs=50, num_threads=4, verbose=True, telemetry=None,
+                        telemetry_label=None, eval_fn=None, eval_every=5):
     """Train LightFM model with regularization to prevent overfitting"""
 
-    model = LightFM(
+    engine = train_model(
+        train_interactions, user_features, item_features,
+        train_weights=train_weights,
+        engine='lightfm',
+        epochs=epochs,
+        num_threads=num_threads,
+        verbose=verbose,
+        telemetry=telemetry,
+        telemetry_label=telemetry_label,
+        eval_fn=eval_fn,
+        eval_every=eval_every,
+        loss=loss,
         no_components=no_components,
         learning_rate=learning_rate,
-        loss=loss,
         item_alpha=item_alpha,  # L2 penalty for item features
         user_alpha=user_alpha,  # L2 penalty for user features
         random_state=42
     )
 
-    model.fit(
-        train_interactions,
-        user_features=user_features,
-        item_features=item_features,
-        sample_weight=train_weights,
-        epochs=epochs,
-        num_threads=num_threads,
-        verbose=verbose
-    )
-
-    return model
+    return engine.model
 
 
 def extended_hyperparameter_search(train_interactions, test_interactions,
-                                   user_features, item_features, train_weights):
+                                   user_features, item_features, train_weights,
+                                   telemetry=None, eval_fn=None):
     """Extended grid search with regularization parameters"""
     print("\n" + "=" * 80)
     print("STEP 6: ADVANCED HYPERPARAMETER TUNING WITH REGULARIZATION")
@@ -231,7 +369,8 @@ def extended_hyperparameter_search(train_interactions, test_interactions,
             train_interactions, user_features, item_features,
             train_weights=train_weights, loss=loss, no_components=n_comp,
             learning_rate=lr, item_alpha=i_alpha, user_alpha=u_alpha,
-            epochs=30, num_threads=4, verbose=False
+            epochs=30, num_threads=4, verbose=False,
+            telemetry=telemetry, telemetry_label=f"search_{i}", eval_fn=eval_fn
         )
 
         # Evaluate on both train and test
@@ -250,6 +389,11 @@ def extended_hyperparameter_search(train_interactions, test_interactions,
 
         overfitting_gap = train_auc - test_auc
 
+        if telemetry is not None:
+            telemetry.record_metrics(train_precision_at_10=train_precision,
+                                     test_precision_at_10=test_precision,
+                                     train_auc=train_auc, test_auc=test_auc)
+
         results.append({
             'no_components': n_comp,
             'learning_rate': lr,
@@ -23,4 +23,9 @@ def save_model_artifacts(model, dataset, user_features, item_features, filepath=
         pickle.dump(artifacts, f)
     print(f"Model and artifacts saved successfully to {filepath}")
 
-save_model_artifacts(model, dataset, user_features, item_features, filepath='renty_lightfm_model_artifacts.pkl')
\ No newline at end of file
+save_model_artifacts(model, dataset, user_features, item_features, filepath='renty_lightfm_model_artifacts.pkl')
+
+"""## Save the item-item fallback model"""
+
+build_item_similarity_fallback(df, dataset, similarity='cosine', top_k=50,
+                               filepath='renty_item_similarity.npz')
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""TRAINING_ENGINES
+
+Pluggable training engines sharing the LightFM interaction matrices.
+
+Every engine exposes the same surface (fit, partial_fit, user/item
+representations, predict, predict_block), so the search, the evaluation and
+`get_recommendations` can run unchanged on top of any of them.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from lightfm import LightFM
+
+try:
+    import implicit
+except ImportError:  # optional backend
+    implicit = None
+
+"""## LIGHTFM ENGINE"""
+
+class LightFMEngine:
+    """Hybrid LightFM model (WARP/BPR/logistic) with user and item features"""
+
+    name = 'lightfm'
+
+    def __init__(self, no_components=50, learning_rate=0.05, loss='warp',
+                 item_alpha=0.0001, user_alpha=0.0001, random_state=42, model=None):
+        self.model = model or LightFM(
+            no_components=no_components,
+            learning_rate=learning_rate,
+            loss=loss,
+            item_alpha=item_alpha,  # L2 penalty for item features
+            user_alpha=user_alpha,  # L2 penalty for user features
+            random_state=random_state
+        )
+        self.user_features = None
+        self.item_features = None
+        self._representations = None
+
+    @classmethod
+    def from_model(cls, model, user_features=None, item_features=None):
+        """Wrap an already trained LightFM model"""
+        engine = cls(model=model)
+        engine.user_features = user_features
+        engine.item_features = item_features
+        return engine
+
+    def fit(self, interactions, user_features=None, item_features=None,
+            sample_weight=None, epochs=50, num_threads=4, verbose=False):
+        self.user_features = user_features
+        self.item_features = item_features
+        self._representations = None
+        self.model.fit(
+            interactions,
+            user_features=user_features,
+            item_features=item_features,
+            sample_weight=sample_weight,
+            epochs=epochs,
+            num_threads=num_threads,
+            verbose=verbose
+        )
+        return self
+
+    def partial_fit(self, interactions, user_features=None, item_features=None,
+                    sample_weight=None, epochs=1, num_threads=4, verbose=False):
+        if user_features is not None:
+            self.user_features = user_features
+        if item_features is not None:
+            self.item_features = item_features
+        self._representations = None
+        self.model.fit_partial(
+            interactions,
+            user_features=self.user_features,
+            item_features=self.item_features,
+            sample_weight=sample_weight,
+            epochs=epochs,
+            num_threads=num_threads,
+            verbose=verbose
+        )
+        return self
+
+    def _get_representations(self):
+        if self._representations is None:
+            self._representations = (
+                self.model.get_user_representations(self.user_features),
+                self.model.get_item_representations(self.item_features)
+            )
+        return self._representations
+
+    def user_representations(self):
+        """Return (biases, embeddings) for every user"""
+        return self._get_representations()[0]
+
+    def item_representations(self):
+        """Return (biases, embeddings) for every item"""
+        return self._get_representations()[1]
+
+    def predict(self, user_ids, item_ids, user_features=None, item_features=None,
+                num_threads=1):
+        return self.model.predict(
+            user_ids, item_ids,
+            user_features=user_features if user_features is not None else self.user_features,
+            item_features=item_features if item_features is not None else self.item_features,
+            num_threads=num_threads
+        )
+
+    def predict_block(self, user_ids, item_ids=None):
+        """Dense score matrix (len(user_ids) x items) from cached representations"""
+        return _score_from_representations(
+            self.user_representations(), self.item_representations(), user_ids, item_ids
+        )
+
+"""## IMPLICIT ALS / BPR ENGINE"""
+
+class ImplicitEngine:
+    """Collaborative filtering backend from the `implicit` library (ALS or BPR).
+
+    Pure matrix factorisation: user and item features are accepted for
+    interface compatibility but ignored. Sample weights (OrderQuantity) are
+    used as confidence values. The number of iterations is the `epochs`
+    argument of `fit`, as for every other engine.
+    """
+
+    def __init__(self, algorithm='als', factors=50, regularization=0.01,
+                 learning_rate=0.01, alpha=1.0, random_state=42):
+        if implicit is None:
+            raise ImportError("The implicit backend requires the `implicit` package: pip install implicit")
+        if algorithm not in ('als', 'bpr'):
+            raise ValueError(f"Unsupported implicit algorithm: {algorithm}")
+
+        self.name = algorithm
+        self.algorithm = algorithm
+        self.params = {
+            'factors': factors,
+            'regularization': regularization,
+            'learning_rate': learning_rate,
+            'alpha': alpha,
+            'random_state': random_state
+        }
+        self.model = None
+
+    def _build_model(self, iterations, num_threads):
+        common = dict(
+            factors=self.params['factors'],
+            regularization=self.params['regularization'],
+            iterations=iterations,
+            random_state=self.params['random_state'],
+            num_threads=num_threads,
+            use_gpu=False
+        )
+        if self.algorithm == 'als':
+            return implicit.als.AlternatingLeastSquares(alpha=self.params['alpha'], **common)
+        return implicit.bpr.BayesianPersonalizedRanking(
+            learning_rate=self.params['learning_rate'], **common
+        )
+
+    @staticmethod
+    def _user_items(interactions, sample_weight):
+        matrix = sample_weight if sample_weight is not None else interactions
+        return sparse.csr_matrix(matrix, dtype=np.float32)
+
+    def fit(self, interactions, user_features=None, item_features=None,
+            sample_weight=None, epochs=15, num_threads=4, verbose=False):
+        self.model = self._build_model(epochs, num_threads)
+        self.model.fit(self._user_items(interactions, sample_weight), show_progress=verbose)
+        return self
+
+    def partial_fit(self, interactions, user_features=None, item_features=None,
+                    sample_weight=None, epochs=1, num_threads=4, verbose=False):
+        """Continue training from the current factors (implicit only re-initialises
+        factors that are still unset)"""
+        if self.model is None:
+            return self.fit(interactions, sample_weight=sample_weight, epochs=epochs,
+                            num_threads=num_threads, verbose=verbose)
+        self.model.iterations = epochs
+        self.model.fit(self._user_items(interactions, sample_weight), show_progress=verbose)
+        return self
+
+    def user_representations(self):
+        factors = np.asarray(self.model.user_factors, dtype=np.float32)
+        return np.zeros(factors.shape[0], dtype=np.float32), factors
+
+    def item_representations(self):
+        factors = np.asarray(self.model.item_factors, dtype=np.float32)
+        return np.zeros(factors.shape[0], dtype=np.float32), factors
+
+    def predict(self, user_ids, item_ids, user_features=None, item_features=None,
+                num_threads=1):
+        user_ids, item_ids = np.broadcast_arrays(np.asarray(user_ids), np.asarray(item_ids))
+        _, user_factors = self.user_representations()
+        _, item_factors = self.item_representations()
+        return np.einsum('ij,ij->i', user_factors[user_ids], item_factors[item_ids])
+
+    def predict_block(self, user_ids, item_ids=None):
+        return _score_from_representations(
+            self.user_representations(), self.item_representations(), user_ids, item_ids
+        )
+
+
+def _score_from_representations(user_repr, item_repr, user_ids, item_ids=None):
+    user_biases, user_embeddings = user_repr
+    item_biases, item_embeddings = item_repr
+    if item_ids is not None:
+        item_biases = item_biases[item_ids]
+        item_embeddings = item_embeddings[item_ids]
+
+    scores = user_embeddings[user_ids] @ item_embeddings.T
+    scores += user_biases[user_ids][:, None]
+    scores += item_biases[None, :]
+    return scores
+
+"""## ENGINE REGISTRY"""
+
+ENGINES = {
+    'lightfm': LightFMEngine,
+    'als': lambda **params: ImplicitEngine(algorithm='als', **params),
+    'bpr': lambda **params: ImplicitEngine(algorithm='bpr', **params),
+    # Defined in item_similarity_model; resolved when the engine is made
+    'itemitem': lambda **params: ItemItemEngine(**params),
+}
+
+
+def make_engine(name='lightfm', **params):
+    """Instantiate a registered training engine by name"""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}'. Available: {sorted(ENGINES)}")
+    return ENGINES[name](**params)
+
+"""## ENGINE COMPARISON HARNESS"""
+
+def _precision_recall_at_k(engine, interactions, k=10, block_size=2048):
+    interactions = sparse.csr_matrix(interactions)
+    users = np.where(np.diff(interactions.indptr) > 0)[0]
+    precisions, recalls = [], []
+
+    for start in range(0, len(users), block_size):
+        block = users[start:start + block_size]
+        scores = engine.predict_block(block)
+        top_k = np.argpartition(-scores, min(k, scores.shape[1]) - 1, axis=1)[:, :k]
+        for row, user in enumerate(block):
+            positives = interactions.indices[interactions.indptr[user]:interactions.indptr[user + 1]]
+            hits = np.isin(top_k[row], positives).sum()
+            precisions.append(hits / k)
+            recalls.append(hits / len(positives))
+
+    return float(np.mean(precisions)), float(np.mean(recalls))
+
+
+def compare_training_engines(train_interactions, test_interactions, user_features,
+                             item_features, train_weights=None, engines=None,
+                             epochs=30, num_threads=4, k=10):
+    """Train every engine on the same matrices and compare speed and quality"""
+    print("\n" + "=" * 80)
+    print("TRAINING ENGINE COMPARISON")
+    print("=" * 80)
+
+    if engines is None:
+        engines = {'lightfm': {}, 'als': {}, 'bpr': {}}
+
+    results = []
+    for name, params in engines.items():
+        try:
+            engine = make_engine(name, **params)
+        except ImportError as e:
+            print(f"  Skipping {name}: {e}")
+            continue
+
+        start = time.perf_counter()
+        engine.fit(train_interactions, user_features=user_features,
+                   item_features=item_features, sample_weight=train_weights,
+                   epochs=epochs, num_threads=num_threads)
+        fit_seconds = time.perf_counter() - start
+
+        precision, recall = _precision_recall_at_k(engine, test_interactions, k=k)
+        results.append({
+            'engine': name,
+            'fit_seconds': fit_seconds,
+            f'test_precision@{k}': precision,
+            f'test_recall@{k}': recall,
+        })
+        print(f"  {name:<8} fit: {fit_seconds:7.2f}s | Precision@{k}: {precision:.4f} | Recall@{k}: {recall:.4f}")
+
+    return pd.DataFrame(results)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""TRAINING_TELEMETRY
+
+Throughput and convergence telemetry for model training.
+
+Records, per training run: wall time and CPU time per epoch, interactions
+processed per second, the effective number of busy threads (CPU seconds per
+wall second), an optional metric trajectory and peak memory. Runs are
+exported as structured JSON so different machines, thread counts and
+parameter sets can be compared side by side.
+"""
+
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+"""## TELEMETRY RECORDER"""
+
+def _available_cores():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count()
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class TrainingTelemetry:
+    """Collects per-epoch training telemetry for one or more training runs"""
+
+    def __init__(self, session_name=None):
+        self.session = {
+            'session_name': session_name or datetime.now().strftime('%Y%m%d_%H%M%S'),
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'host': {
+                'platform': platform.platform(),
+                'python': platform.python_version(),
+                'cpu_count': os.cpu_count(),
+                'available_cores': _available_cores(),
+            },
+        }
+        self.runs = []
+        self._active = None
+
+    def start_run(self, label, n_interactions, num_threads, params=None):
+        self._active = {
+            'label': label,
+            'params': params or {},
+            'n_interactions': int(n_interactions),
+            'num_threads': num_threads,
+            'epochs': [],
+            'metrics': {},
+        }
+        # Leave the peak alone when someone else (e.g. PipelineProfiler) is tracing;
+        # the run's peak is then measured relative to the memory traced at its start
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        self._traced_at_start = tracemalloc.get_traced_memory()
+        self._run_start = (time.perf_counter(), time.process_time())
+        return self._active
+
+    def record_epoch(self, epoch, wall_seconds, cpu_seconds, metrics=None):
+        run = self._active
+        run['epochs'].append({
+            'epoch': epoch,
+            'wall_seconds': wall_seconds,
+            'cpu_seconds': cpu_seconds,
+            'interactions_per_second': run['n_interactions'] / wall_seconds if wall_seconds > 0 else None,
+            'effective_threads': cpu_seconds / wall_seconds if wall_seconds > 0 else None,
+            'metrics': metrics or {},
+        })
+
+    def record_metrics(self, **metrics):
+        """Attach final evaluation metrics to the active (or most recent) run"""
+        run = self._active or self.runs[-1]
+        run['metrics'].update({k: float(v) for k, v in metrics.items()})
+
+    def finish_run(self):
+        run = self._active
+        wall_start, cpu_start = self._run_start
+        _, peak_traced = tracemalloc.get_traced_memory()
+        if self._started_tracing:
+            tracemalloc.stop()
+        base_traced, peak_before = self._traced_at_start
+        # An unchanged outer peak means the run stayed below it: its own peak is unknown
+        peak_traced_mb = (max(peak_traced - base_traced, 0) / 1024 ** 2
+                          if self._started_tracing or peak_traced > peak_before else None)
+
+        epoch_walls = [e['wall_seconds'] for e in run['epochs']]
+        effective = [e['effective_threads'] for e in run['epochs'] if e['effective_threads'] is not None]
+        run['summary'] = {
+            'total_wall_seconds': time.perf_counter() - wall_start,
+            'total_cpu_seconds': time.process_time() - cpu_start,
+            'mean_epoch_seconds': float(np.mean(epoch_walls)) if epoch_walls else None,
+            'interactions_per_second': (run['n_interactions'] / float(np.mean(epoch_walls))
+                                        if epoch_walls and np.mean(epoch_walls) > 0 else None),
+            'effective_threads': float(np.mean(effective)) if effective else None,
+            'peak_traced_memory_mb': peak_traced_mb,
+            'max_rss_mb': _max_rss_mb(),
+        }
+        self.runs.append(run)
+        self._active = None
+        return run
+
+    # ===== EXPORT =====
+
+    def to_dict(self):
+        return {**self.session, 'runs': self.runs}
+
+    def to_json(self, filepath='renty_training_telemetry.json'):
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        print(f"Training telemetry saved to {filepath}")
+        return filepath
+
+    def summary_frame(self):
+        return telemetry_summary_frame(self.to_dict())
+
+
+def telemetry_summary_frame(telemetry):
+    """One row per training run with its throughput summary and final metrics"""
+    rows = []
+    for run in telemetry['runs']:
+        rows.append({
+            'session': telemetry['session_name'],
+            'available_cores': telemetry['host']['available_cores'],
+            'label': run['label'],
+            'num_threads': run['num_threads'],
+            'epochs': len(run['epochs']),
+            **{f'param_{k}': v for k, v in run['params'].items()},
+            **run['summary'],
+            **run['metrics'],
+        })
+    return pd.DataFrame(rows)
+
+
+def compare_telemetry_runs(*filepaths):
+    """Load several telemetry JSON exports into one comparison table"""
+    frames = []
+    for filepath in filepaths:
+        with open(filepath) as f:
+            frames.append(telemetry_summary_frame(json.load(f)))
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""PIPELINE_DAG
+
+Step-level DAG runner for the recommendation pipeline.
+
+Each pipeline step is declared with named, typed inputs and outputs. The
+runner orders steps by their dependencies, checkpoints every step's outputs
+(pickled through `TrainingCache`, keyed by the step's code, parameters and
+upstream checkpoint keys) and, on a rerun after a failure, resumes from the
+last valid checkpoint instead of starting from zero. Steps whose inputs are
+ready run concurrently on a thread pool. `main()` runs the recommendation
+pipeline through this runner, including the backtest, benchmark history,
+telemetry, profiling and headless plotting options.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import pandas as pd
+
+"""## STEP DEFINITION"""
+
+class Step:
+    """One pipeline step: `func(*inputs, **params)` returning its declared outputs.
+
+    `outputs` maps each output name to its expected type (or None to skip the
+    check). A step with several outputs returns them as a tuple in declaration
+    order. `tracks` lists the functions whose bytecode keys the checkpoint
+    (defaults to `func`; pass the wrapped function when `func` is a lambda).
+    `checkpoint=False` marks side-effect steps (plots, printing) that are
+    always re-run, and `concurrent=False` keeps a step on the calling thread.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=None, params=None, tracks=None,
+                 checkpoint=True, concurrent=True):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = dict(outputs or {})
+        self.params = dict(params or {})
+        self.tracks = tuple(tracks or (func,))
+        self.checkpoint = checkpoint
+        self.concurrent = concurrent
+
+    def run(self, values):
+        result = self.func(*[values[name] for name in self.inputs], **self.params)
+        names = list(self.outputs)
+        if not names:
+            return {}
+        produced = dict(zip(names, result if len(names) > 1 else (result,)))
+        for name, expected in self.outputs.items():
+            if expected is not None and not isinstance(produced[name], expected):
+                raise TypeError(f"Step '{self.name}' output '{name}' is "
+                                f"{type(produced[name]).__name__}, expected {expected.__name__}")
+        return produced
+
+"""## DAG RUNNER"""
+
+class PipelineDAG:
+    """Dependency-ordered runner with checkpoint/resume and concurrent independent steps"""
+
+    def __init__(self, cache=None, max_workers=2, profiler=None):
+        self.cache = cache or TrainingCache('renty_checkpoints')
+        self.max_workers = max_workers
+        self.profiler = profiler or PipelineProfiler(enabled=False)
+        self.steps = {}
+        self.producers = {}
+        self.timings = {}
+        self._initial = {}
+
+    def add(self, step):
+        for output in step.outputs:
+            if output in self.producers:
+                raise ValueError(f"Output '{output}' is produced by both "
+                                 f"'{self.producers[output]}' and '{step.name}'")
+            self.producers[output] = step.name
+        self.steps[step.name] = step
+        return step
+
+    def dependencies(self, step):
+        missing = [name for name in step.inputs if name not in self.producers
+                   and name not in self._initial]
+        if missing:
+            raise ValueError(f"Step '{step.name}' needs undeclared inputs: {missing}")
+        return {self.producers[name] for name in step.inputs if name in self.producers}
+
+    def _order(self, targets):
+        """Topological order of the steps needed for `targets` (cycle-checked)"""
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle detected at step '{name}'")
+            visiting.add(name)
+            for dependency in sorted(self.dependencies(self.steps[name])):
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for target in targets:
+            visit(target)
+        return order
+
+    def _step_key(self, step, keys):
+        upstream = [keys[name] for name in step.inputs]
+        code = [function_fingerprint(func) for func in step.tracks]
+        return self.cache.key(step.name, *code, *upstream, **step.params)
+
+    def _input_key(self, name, value):
+        if isinstance(value, (str, os.PathLike)) and os.path.isfile(value):
+            return self.cache.key('input', name, file_fingerprint(value))
+        return self.cache.key('input', name, repr(value))
+
+    def run(self, targets=None, **initial):
+        """Run the steps needed for `targets` (default: all) and return every produced value.
+
+        `initial` supplies external inputs (e.g. `filepath`), keyed by a
+        fingerprint of their value. Steps whose checkpoint key is already
+        stored are loaded instead of executed. With an enabled profiler the
+        steps run one at a time so their timings and memory peaks are their own.
+        """
+        self._initial = initial
+        order = self._order(targets or list(self.steps))
+        values = dict(initial)
+        keys = {name: self._input_key(name, value) for name, value in initial.items()}
+        step_keys = {}
+        dependencies = {name: self.dependencies(self.steps[name]) for name in order}
+
+        pending, running, finished = list(order), {}, set()
+        # CPU time and tracemalloc are process-wide, so profiled steps must not overlap
+        max_workers = 1 if self.profiler.enabled else self.max_workers
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while pending or running:
+                ready = [name for name in pending if dependencies[name] <= finished]
+                for name in ready:
+                    pending.remove(name)
+                    step = self.steps[name]
+                    step_keys[name] = self._step_key(step, keys)
+                    for output in step.outputs:
+                        keys[output] = self.cache.key(output, step_keys[name])
+                    step_values = {input_name: values[input_name] for input_name in step.inputs}
+                    if step.concurrent:
+                        running[pool.submit(self._execute, step, step_values, step_keys[name])] = name
+                    else:
+                        values.update(self._execute(step, step_values, step_keys[name]))
+                        finished.add(name)
+
+                if ready and not running and pending:
+                    continue
+                if not running:
+                    if not pending:
+                        break
+                    raise RuntimeError(f"Steps {pending} can never become ready")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    values.update(future.result())  # re-raises the step's exception
+                    finished.add(name)
+
+        return values
+
+    def _execute(self, step, values, key):
+        start = time.perf_counter()
+        with self.profiler.step(step.name) as record:
+            if step.checkpoint:
+                outputs = self.cache.get_or_compute(step.name, key, lambda: step.run(values))
+            else:
+                outputs = step.run(values)
+            record.set_rows(tuple(outputs.values()))
+        self.timings[step.name] = time.perf_counter() - start
+        return outputs
+
+    def report(self):
+        summary = self.cache.summary()
+        print("\n" + "=" * 80)
+        print("PIPELINE DAG SUMMARY")
+        print("=" * 80)
+        for name, seconds in self.timings.items():
+            status = 'resumed' if name in summary['hits'] else 'ran'
+            print(f"  {name:<24} {status:<8} {seconds:8.2f}s")
+
+"""## RECOMMENDATION PIPELINE DAG"""
+
+def build_recommendation_dag(cache=None, max_workers=2, text_max_features=50,
+                             feature_hash_buckets=None, final_epochs=60, num_threads=4,
+                             n_recommendations=10, eval_n_jobs=1, telemetry=None, profiler=None,
+                             backtest=False, benchmark_path='renty_benchmarks.jsonl',
+                             benchmark_window=5, headless=False, plot_dir='renty_plots',
+                             plot_workers=None):
+    """Declare load → features → TF-IDF → LightFM prep → split → search → train →
+    evaluate / recommend / backtest / benchmark / plots as a DAG. Evaluation,
+    the recommendation preview and the backtest only depend on upstream
+    outputs, so they run concurrently.
+
+    `telemetry`, `profiler` and `eval_n_jobs` change how steps run but not
+    their results, so they are captured by the step functions instead of
+    keying the checkpoints. While recording telemetry, the search and the
+    final model also log test precision@10 and AUC every few epochs. With `headless=True` plots are rendered to
+    `plot_dir` by background workers appended to `plot_workers`.
+    """
+    dag = PipelineDAG(cache=cache, max_workers=max_workers, profiler=profiler)
+    plot_workers = plot_workers if plot_workers is not None else []
+
+    def show_or_render(plot_func, *args, filename):
+        if headless:
+            plot_workers.append(render_plot_in_background(
+                plot_func, *args, output_path=os.path.join(plot_dir, filename)))
+        else:
+            plot_func(*args)
+
+    def record_benchmark(evaluation_results, best_params):
+        # Runs that reused a cached model report ~0s training; keep them in their own baseline
+        label = 'cached_model' if 'final_model' in dag.cache.summary()['hits'] else None
+        performance = {
+            'train_seconds': dag.timings.get('final_model'),
+            'eval_seconds': dag.timings.get('evaluation'),
+            'peak_memory_mb': _max_rss_mb(),
+        }
+        benchmarks = BenchmarkStore(benchmark_path)
+        baseline_results = benchmarks.baseline(benchmark_window, label=label)
+        benchmarks.regression_report({**evaluation_results, **performance},
+                                     last_n=benchmark_window, label=label)
+        benchmarks.append(evaluation_results, performance, params=best_params, label=label)
+        return baseline_results
+
+    def validation_eval(test_interactions, k=10):
+        # Epoch-level metric trajectory for the telemetry (train_model only calls it while recording)
+        if telemetry is None:
+            return None
+
+        def eval_fn(engine):
+            ranking = evaluate_ranking(engine, {'test': test_interactions}, k_values=(k,),
+                                       n_jobs=eval_n_jobs)['test']
+            return {f'test_precision@{k}': float(ranking[f'precision@{k}']),
+                    'test_auc': float(ranking['auc'])}
+        return eval_fn
+
+    def plot_comparison(baseline_results, evaluation_results):
+        if baseline_results is None:
+            print("\nNo benchmark history yet; skipping the baseline comparison plot")
+        else:
+            show_or_render(plot_comparison_results, baseline_results, evaluation_results,
+                           filename='comparison_results.png')
+
+    dag.add(Step('load', load_and_preprocess_data, inputs=['filepath'],
+                 outputs={'raw_df': pd.DataFrame}))
+    dag.add(Step('features', engineer_features, inputs=['raw_df'],
+                 outputs={'features_df': pd.DataFrame}))
+    dag.add(Step('text_features',
+                 lambda features_df, max_features: extract_text_features(features_df, max_features=max_features),
+                 inputs=['features_df'], params={'max_features': text_max_features},
+                 tracks=[extract_text_features],
+                 outputs={'df': pd.DataFrame, 'text_feature_cols': list}))
+    dag.add(Step('lightfm_data',
+                 lambda df, text_feature_cols, feature_hash_buckets: prepare_lightfm_data(
+                     df, text_feature_cols, feature_hash_buckets=feature_hash_buckets),
+                 inputs=['df', 'text_feature_cols'],
+                 params={'feature_hash_buckets': feature_hash_buckets},
+                 tracks=[prepare_lightfm_data],
+                 outputs={'dataset': None, 'user_features': None, 'item_features': None}))
+    dag.add(Step('interactions', create_interaction_matrices, inputs=['df', 'dataset'],
+                 outputs={'train_interactions': None, 'test_interactions': None,
+                          'train_weights': None, 'test_weights': None}))
+    dag.add(Step('search',
+                 lambda train_interactions, test_interactions, user_features, item_features,
+                        train_weights: extended_hyperparameter_search(
+                     train_interactions, test_interactions, user_features, item_features,
+                     train_weights, telemetry=telemetry,
+                     eval_fn=validation_eval(test_interactions)),
+                 inputs=['train_interactions', 'test_interactions', 'user_features',
+                         'item_features', 'train_weights'],
+                 tracks=[extended_hyperparameter_search, train_lightfm_model],
+                 outputs={'best_params': dict, 'results_df': pd.DataFrame}))
+    dag.add(Step('final_model',
+                 lambda train_interactions, test_interactions, user_features, item_features,
+                        train_weights, best_params, epochs, num_threads: train_lightfm_model(
+                     train_interactions, user_features, item_features,
+                     train_weights=train_weights, epochs=epochs, num_threads=num_threads,
+                     verbose=True, telemetry=telemetry, telemetry_label='final_model',
+                     eval_fn=validation_eval(test_interactions), **best_params),
+                 inputs=['train_interactions', 'test_interactions', 'user_features',
+                         'item_features', 'train_weights', 'best_params'],
+                 params={'epochs': final_epochs, 'num_threads': num_threads},
+                 tracks=[train_lightfm_model],
+                 outputs={'final_model': None}))
+    dag.add(Step('evaluation',
+                 lambda final_model, train_interactions, test_interactions, user_features,
+                        item_features: evaluate_model(
+                     final_model, train_interactions, test_interactions,
+                     user_features, item_features, n_jobs=eval_n_jobs),
+                 inputs=['final_model', 'train_interactions', 'test_interactions',
+                         'user_features', 'item_features'],
+                 tracks=[evaluate_model],
+                 outputs={'evaluation_results': dict}))
+    if backtest:
+        # Folds refit TF-IDF on their own training rows, so they start from the pre-text frame
+        dag.add(Step('backtest',
+                     lambda features_df, best_params, text_max_features, feature_hash_buckets, epochs:
+                         temporal_backtest(features_df, text_max_features=text_max_features,
+                                           feature_hash_buckets=feature_hash_buckets,
+                                           epochs=epochs, **best_params),
+                     inputs=['features_df', 'best_params'],
+                     params={'text_max_features': text_max_features,
+                             'feature_hash_buckets': feature_hash_buckets, 'epochs': 30},
+                     tracks=[temporal_backtest],
+                     outputs={'backtest_results': pd.DataFrame}))
+    dag.add(Step('recommendations',
+                 lambda df, final_model, dataset, user_features, item_features, n_recommendations:
+                     display_user_recommendations(df, final_model, dataset, user_features,
+                                                  item_features, n_recommendations=n_recommendations),
+                 inputs=['df', 'final_model', 'dataset', 'user_features', 'item_features'],
+                 params={'n_recommendations': n_recommendations}, checkpoint=False))
+    # The benchmark store is appended to once per run, never replayed from a checkpoint
+    dag.add(Step('benchmark', record_benchmark, inputs=['evaluation_results', 'best_params'],
+                 outputs={'baseline_results': None}, checkpoint=False, concurrent=False))
+    # matplotlib is not thread-safe, so plots stay on the calling thread
+    dag.add(Step('comparison_plot', plot_comparison,
+                 inputs=['baseline_results', 'evaluation_results'],
+                 checkpoint=False, concurrent=False))
+    dag.add(Step('hyperparameter_plots',
+                 lambda results_df: show_or_render(plot_hyperparameter_analysis, results_df,
+                                                   filename='hyperparameter_analysis.png'),
+                 inputs=['results_df'], checkpoint=False, concurrent=False))
+    return dag
+
+
+def run_recommendation_dag(filepath, checkpoint_dir='renty_checkpoints', resume=True,
+                           telemetry_path=None, profile_path=None, profile_memory=False,
+                           sample_stacks=False, **options):
+    """Run the recommendation pipeline DAG, resuming from the last valid checkpoint.
+
+    `telemetry_path` exports per-epoch training telemetry as JSON,
+    `profile_path` the per-step timing profile (with peak traced memory when
+    `profile_memory=True`, at the cost of slower, less accurate timings), and
+    `sample_stacks=True` also dumps collapsed stacks for the slowest step. Other `options` are
+    passed to `build_recommendation_dag`.
+    """
+    print(" INITIATING RECOMMENDER PIPELINE (DAG MODE)")
+    print("=" * 80)
+
+    telemetry = TrainingTelemetry() if telemetry_path else None
+    profiler = PipelineProfiler(enabled=bool(profile_path) or sample_stacks,
+                                trace_memory=profile_memory, sample_stacks=sample_stacks)
+    plot_workers = []
+
+    dag = build_recommendation_dag(cache=TrainingCache(checkpoint_dir, enabled=resume),
+                                   telemetry=telemetry, profiler=profiler,
+                                   plot_workers=plot_workers, **options)
+    values = dag.run(filepath=filepath)
+    dag.report()
+
+    if telemetry is not None:
+        telemetry.to_json(telemetry_path)
+
+    # Charts were rendered off the critical path; only wait for them at the very end
+    wait_for_plots(plot_workers)
+
+    if profiler.enabled:
+        profiler.print_report()
+        if profile_path:
+            profiler.to_json(profile_path)
+        if sample_stacks:
+            profiler.dump_collapsed_stacks()
+
+    print("\n" + "=" * 80)
+    print(" IMPROVED RECOMMENDER SYSTEM PIPELINE COMPLETED!")
+    print("=" * 80)
+
+    return (values['final_model'], values['dataset'], values['user_features'],
+            values['item_features'], values['df'], values['evaluation_results'])
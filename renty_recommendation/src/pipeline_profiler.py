@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""PIPELINE_PROFILER
+
+Per-step timing and memory profiler for the recommendation pipeline.
+
+Every wrapped step records wall time, CPU time and the number of rows it
+produced, and the run is emitted as a structured report. Peak traced memory
+is opt-in (`trace_memory=True`): tracemalloc hooks every allocation and
+slows allocation-heavy steps down, so traced wall times are inflated.
+Optionally a background thread samples the main thread's call stack so the
+slowest step can be dumped as collapsed stacks (one `frame;frame;frame count`
+line per stack, the input format of flamegraph tools).
+"""
+
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+import pandas as pd
+from scipy import sparse
+
+"""## STACK SAMPLER"""
+
+class StackSampler:
+    """Samples one thread's call stack at a fixed interval into collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _collapse(self, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+"""## STEP PROFILER"""
+
+def count_rows(result):
+    """Row count of a step's output: DataFrame length, matrix rows/nnz, first countable item of a tuple"""
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if sparse.issparse(result):
+        return int(result.nnz)
+    if isinstance(result, tuple):
+        for item in result:
+            rows = count_rows(item)
+            if rows is not None:
+                return rows
+    return None
+
+
+class StepRecord:
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+
+    def set_rows(self, result):
+        """Record the row count of the step's output and pass it through"""
+        self.rows = count_rows(result)
+        return result
+
+
+class PipelineProfiler:
+    """Wraps pipeline steps to record wall/CPU time, row counts and (opt-in) peak memory"""
+
+    def __init__(self, enabled=True, trace_memory=False, sample_stacks=False, sample_interval=0.005):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.sample_stacks = sample_stacks
+        self.sample_interval = sample_interval
+        self.steps = []
+        self.stacks = {}
+
+    @contextmanager
+    def step(self, name):
+        """Profile the enclosed block: `with profiler.step('load') as step: df = step.set_rows(...)`"""
+        record = StepRecord(name)
+        if not self.enabled:
+            yield record
+            return
+
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base_memory, _ = tracemalloc.get_traced_memory()
+
+        sampler = None
+        if self.sample_stacks:
+            sampler = StackSampler(threading.get_ident(), self.sample_interval).start()
+
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            wall_seconds = time.perf_counter() - wall_start
+            cpu_seconds = time.process_time() - cpu_start
+
+            peak_mb = None
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                peak_mb = max(peak - base_memory, 0) / 1024 ** 2
+                if started_tracing:
+                    tracemalloc.stop()
+            if sampler is not None:
+                self.stacks[name] = sampler.stop()
+
+            self.steps.append({
+                'step': name,
+                'wall_seconds': wall_seconds,
+                'cpu_seconds': cpu_seconds,
+                'cpu_utilisation': cpu_seconds / wall_seconds if wall_seconds > 0 else None,
+                'peak_traced_mb': peak_mb,
+                'rows': record.rows,
+            })
+
+    # ===== REPORTING =====
+
+    def report_frame(self):
+        frame = pd.DataFrame(self.steps)
+        if not frame.empty:
+            frame['wall_share'] = frame['wall_seconds'] / frame['wall_seconds'].sum()
+        return frame
+
+    def slowest_step(self):
+        return max(self.steps, key=lambda s: s['wall_seconds'])['step'] if self.steps else None
+
+    def print_report(self):
+        frame = self.report_frame()
+        print("\n" + "=" * 80)
+        print("PIPELINE PROFILE")
+        print("=" * 80)
+        if frame.empty:
+            print("  No steps were profiled")
+            return frame
+        for _, row in frame.iterrows():
+            peak = f"{row['peak_traced_mb']:9.1f} MB" if pd.notna(row['peak_traced_mb']) else "        n/a"
+            rows = f"{int(row['rows']):>10,}" if pd.notna(row['rows']) else "         -"
+            print(f"  {row['step']:<30} wall {row['wall_seconds']:8.2f}s ({row['wall_share']:5.1%}) | "
+                  f"cpu {row['cpu_seconds']:8.2f}s | peak {peak} | rows {rows}")
+        print(f"  Slowest step: {self.slowest_step()}")
+        return frame
+
+    def to_json(self, filepath='renty_profile.json'):
+        with open(filepath, 'w') as f:
+            json.dump({'steps': self.steps, 'slowest_step': self.slowest_step()}, f, indent=2, default=str)
+        print(f"Pipeline profile saved to {filepath}")
+        return filepath
+
+    def dump_collapsed_stacks(self, filepath='renty_slowest_step.folded', step=None):
+        """Write the sampled stacks of `step` (default: the slowest) in collapsed format"""
+        step = step or self.slowest_step()
+        stacks = self.stacks.get(step)
+        if not stacks:
+            print(f"No stack samples recorded for step '{step}'")
+            return None
+        with open(filepath, 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"Collapsed stacks for '{step}' ({sum(stacks.values())} samples) saved to {filepath}")
+        return filepath
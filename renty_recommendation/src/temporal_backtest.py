@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""TEMPORAL_BACKTEST
+
+Rolling-origin backtest for the recommendation pipeline.
+
+Instead of a single 80/20 split by row position, the model is trained on
+everything before a cutoff date and evaluated on the following horizon, for
+several cutoffs walking across 2020-2022. Each fold fits its own dataset,
+TF-IDF vocabulary and feature matrices on the pre-cutoff rows only, so no
+fold sees users, items, description terms or attribute values from its future.
+
+Work shared by every fold is done once: the per-customer and per-product
+attribute tokens are extracted from the (engineered) frame up front, and each
+fold only selects the tokens of its own users and items. Folds run on a
+thread pool: LightFM releases the GIL while fitting, and threads avoid forking
+a process whose OpenMP runtime is already running (which can deadlock) and
+the notebook globals that spawned workers could not import. Feature
+preparation holds the GIL, so folds overlap mainly in training.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+"""## FOLD DEFINITION"""
+
+def rolling_cutoffs(start='2020-07-01', end='2022-01-01', freq='3MS'):
+    """Cutoff dates from `start` to `end` (inclusive) every `freq`"""
+    return list(pd.date_range(start=start, end=end, freq=freq))
+
+
+def _fold_indices(order_dates, cutoff, horizon_days, train_window_days=None):
+    """Row positions of the train (before cutoff) and test (cutoff + horizon) windows"""
+    test_end = cutoff + pd.Timedelta(days=horizon_days)
+    train_mask = order_dates < cutoff
+    if train_window_days is not None:
+        train_mask &= order_dates >= cutoff - pd.Timedelta(days=train_window_days)
+    test_mask = (order_dates >= cutoff) & (order_dates < test_end)
+    return np.flatnonzero(train_mask), np.flatnonzero(test_mask)
+
+
+"""## FOLD EXECUTION"""
+
+def _fold_text_tokens(train_df, max_features):
+    """TF-IDF tokens per product, with the vocabulary fitted on the fold's descriptions only"""
+    products = train_df.groupby('ProductKey', as_index=False)['ProductDescription'].first()
+    try:
+        text_df, text_cols = extract_text_features(products, max_features=max_features, verbose=False)
+    except ValueError:  # too few descriptions for min_df
+        return {}
+    # Same rule as prepare_lightfm_data: top 20 terms, weight above 0.1
+    top_cols = text_cols[:20]
+    relevant = text_df[top_cols].to_numpy() > 0.1
+    return {product_key: [col for col, hit in zip(top_cols, row) if hit]
+            for product_key, row in zip(text_df['ProductKey'], relevant)}
+
+
+def _build_fold(train_df, test_df, user_tokens, item_tokens, text_max_features=50,
+                feature_hash_buckets=None):
+    """Dataset, feature matrices and interaction matrices fitted on `train_df` alone.
+
+    `user_tokens`/`item_tokens` map every key to its attribute tokens; only the
+    fold's own users and items are used. Test rows of users or items first seen
+    after the cutoff have no features in the fold's dataset and are dropped
+    (they are cold-start cases).
+    """
+    users = train_df['CustomerKey'].unique()
+    items = train_df['ProductKey'].unique()
+    text_tokens = _fold_text_tokens(train_df, text_max_features)
+    dataset, user_features, item_features = fit_lightfm_dataset(
+        users, items,
+        [(user, user_tokens[user]) for user in users],
+        [(item, item_tokens[item] + text_tokens.get(item, [])) for item in items],
+        feature_hash_buckets=feature_hash_buckets, verbose=False
+    )
+    train_interactions, train_weights = build_interaction_matrices(train_df, dataset)
+
+    known = (test_df['CustomerKey'].isin(users) & test_df['ProductKey'].isin(items)).to_numpy()
+    test_interactions, _ = build_interaction_matrices(test_df[known], dataset)
+    return user_features, item_features, train_interactions, train_weights, test_interactions, int(known.sum())
+
+
+def _run_fold(fold, user_features, item_features, engine, epochs, k_values, extended,
+              num_threads, engine_params):
+    train_interactions, train_weights, test_interactions = fold['matrices']
+
+    start = time.perf_counter()
+    model = train_model(
+        train_interactions, user_features, item_features,
+        train_weights=train_weights,
+        engine=engine,
+        epochs=epochs,
+        num_threads=num_threads,
+        verbose=False,
+        **engine_params
+    )
+    fit_seconds = time.perf_counter() - start
+
+    ranking = evaluate_ranking(
+        model, {'train': train_interactions, 'test': test_interactions},
+        user_features=user_features, item_features=item_features,
+        k_values=k_values, extended=extended
+    )
+
+    result = {
+        'cutoff': fold['cutoff'],
+        'train_rows': fold['train_rows'],
+        'test_rows': fold['test_rows'],
+        'cold_test_rows': fold['cold_test_rows'],
+        'test_users': int((np.diff(sparse.csr_matrix(test_interactions).indptr) > 0).sum()),
+        'fit_seconds': fit_seconds,
+        'train_auc': ranking['train']['auc'],
+    }
+    result.update({f'test_{name}': value for name, value in ranking['test'].items()})
+    return result
+
+"""## BACKTEST HARNESS"""
+
+def temporal_backtest(df, text_max_features=50, feature_hash_buckets=None, cutoffs=None,
+                      horizon_days=90, train_window_days=None, engine='lightfm',
+                      epochs=30, k_values=(5, 10, 20), extended=False, n_jobs=-1,
+                      num_threads=None, min_test_rows=1, **engine_params):
+    """Train and evaluate at several cutoff dates and summarise metric stability.
+
+    Each fold trains on orders before its cutoff (optionally only the last
+    `train_window_days`) and is evaluated on the next `horizon_days`. `df` is
+    the engineered frame with ProductDescription; each fold fits its own
+    `text_max_features`-term TF-IDF vocabulary on its training rows. `n_jobs`
+    folds (-1: one per core) run concurrently on threads, splitting the cores
+    between them.
+    Returns a DataFrame with one row per fold.
+    """
+    print("\n" + "=" * 80)
+    print("ROLLING-ORIGIN TEMPORAL BACKTEST")
+    print("=" * 80)
+
+    cutoffs = [pd.Timestamp(c) for c in (cutoffs if cutoffs is not None else rolling_cutoffs())]
+    order_dates = df['OrderDate'].to_numpy()
+
+    folds = []
+    for cutoff in cutoffs:
+        train_positions, test_positions = _fold_indices(
+            order_dates, cutoff.to_datetime64(), horizon_days, train_window_days
+        )
+        if len(train_positions) == 0 or len(test_positions) < min_test_rows:
+            print(f"  Skipping cutoff {cutoff.date()}: "
+                  f"{len(train_positions)} train / {len(test_positions)} test rows")
+            continue
+        folds.append((cutoff, train_positions, test_positions))
+
+    if not folds:
+        print("  No usable folds in the requested date range")
+        return pd.DataFrame()
+
+    # Attribute tokens of every customer and product, extracted once for all folds
+    user_tuples, item_tuples = lightfm_feature_tuples(df, text_feature_cols=[])
+    user_tokens, item_tokens = dict(user_tuples), dict(item_tuples)
+
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    n_jobs = max(1, min(n_jobs if n_jobs and n_jobs > 0 else cores, len(folds)))
+    # Split the cores between concurrent folds so they don't oversubscribe
+    num_threads = num_threads or max(1, cores // n_jobs)
+    print(f"Running {len(folds)} folds on {n_jobs} thread(s), {num_threads} training thread(s) each")
+
+    def backtest_fold(fold):
+        cutoff, train_positions, test_positions = fold
+        (user_features, item_features, train_interactions, train_weights,
+         test_interactions, known_test_rows) = _build_fold(
+            df.iloc[train_positions], df.iloc[test_positions], user_tokens, item_tokens,
+            text_max_features=text_max_features, feature_hash_buckets=feature_hash_buckets
+        )
+        if known_test_rows < min_test_rows:
+            print(f"  Skipping cutoff {cutoff.date()}: only {known_test_rows} test rows "
+                  f"of users and items seen before the cutoff")
+            return None
+        return _run_fold({
+            'cutoff': cutoff,
+            'train_rows': len(train_positions),
+            'test_rows': known_test_rows,
+            'cold_test_rows': len(test_positions) - known_test_rows,
+            'matrices': (train_interactions, train_weights, test_interactions),
+        }, user_features, item_features, engine, epochs, k_values, extended, num_threads, engine_params)
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        fold_results = [result for result in pool.map(backtest_fold, folds) if result is not None]
+
+    if not fold_results:
+        print("  No usable folds in the requested date range")
+        return pd.DataFrame()
+
+    results_df = pd.DataFrame(fold_results)
+
+    print("\n FOLD RESULTS:")
+    print("-" * 80)
+    for _, fold in results_df.iterrows():
+        print(f"  {fold['cutoff'].date()} | train {fold['train_rows']:>7} | test {fold['test_rows']:>6} | "
+              f"Test AUC: {fold['test_auc']:.4f} | Precision@{k_values[0]}: "
+              f"{fold[f'test_precision@{k_values[0]}']:.4f} | fit {fold['fit_seconds']:.1f}s")
+
+    metric_cols = [c for c in results_df.columns
+                   if c == 'train_auc' or (c.startswith('test_') and c not in ('test_rows', 'test_users'))]
+    summary = results_df[metric_cols].agg(['mean', 'std']).T
+    print("\n METRIC STABILITY ACROSS FOLDS (mean ± std):")
+    print("-" * 80)
+    for metric, row in summary.iterrows():
+        print(f"  {metric:<24} {row['mean']:.4f} ± {row['std']:.4f}")
+
+    return results_df
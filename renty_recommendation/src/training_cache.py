@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""TRAINING_CACHE
+
+Content-addressed cache for the recommendation pipeline.
+
+Every artifact (loaded data, feature matrices, interaction splits, search
+results, trained models) is stored under a key derived from the fingerprint
+of its inputs, the parameters used and the bytecode of the function that
+produced it, including the pipeline helpers and classes it calls. Re-running
+`main()` with unchanged inputs reuses the stored artifacts instead of
+recomputing them.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+import pandas as pd
+
+"""## FINGERPRINTS"""
+
+def file_fingerprint(filepath, chunk_size=1 << 20):
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dataframe_fingerprint(df):
+    """Stable hash of a DataFrame's values, index, columns and dtypes"""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(repr(df.dtypes.astype(str).tolist()).encode())
+    return digest.hexdigest()
+
+
+# Bump to invalidate every cached artifact (e.g. after a library upgrade changes results)
+CACHE_VERSION = 1
+
+
+def _update_with_code(digest, code, names):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    names.update(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            _update_with_code(digest, const, names)
+        else:
+            digest.update(repr(const).encode())
+
+
+def _local_callees(namespace, names):
+    """Functions and classes among `names` that are defined in the pipeline's own namespace"""
+    for name in sorted(names):
+        obj = namespace.get(name)
+        if getattr(obj, '__globals__', None) is namespace:
+            yield obj
+        elif isinstance(obj, type) and obj.__module__ == namespace.get('__name__'):
+            yield obj
+
+
+def function_fingerprint(func, salt=CACHE_VERSION):
+    """Hash of a function's bytecode and of every pipeline function or class it
+    calls (transitively), so editing a step or any helper it uses invalidates
+    its cache. `salt` is folded in to force invalidation when code is unchanged.
+    """
+    digest = hashlib.sha256(repr(salt).encode())
+    seen = set()
+    pending = [func]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        digest.update(getattr(obj, '__qualname__', repr(obj)).encode())
+        if isinstance(obj, type):
+            members = [getattr(member, '__func__', member) for _, member in sorted(vars(obj).items())]
+            functions = [member for member in members if hasattr(member, '__code__')]
+        else:
+            functions = [obj]
+        for function in functions:
+            names = set()
+            _update_with_code(digest, function.__code__, names)
+            pending.extend(_local_callees(function.__globals__, names))
+    return digest.hexdigest()
+
+"""## CACHE STORE"""
+
+class TrainingCache:
+    """Pickle-backed artifact store keyed by input fingerprint + parameters"""
+
+    def __init__(self, cache_dir='renty_cache', enabled=True):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self.hits = []
+        self.misses = []
+
+    def key(self, stage, *parts, **params):
+        """Derive a cache key from upstream keys/fingerprints and parameters"""
+        payload = json.dumps({'stage': stage, 'parts': parts, 'params': params},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, stage, key):
+        return self.cache_dir / stage / f"{key}.pkl"
+
+    def get_or_compute(self, stage, key, compute):
+        """Return the cached artifact for (stage, key), computing and storing it on a miss"""
+        if not self.enabled:
+            return compute()
+
+        path = self._path(stage, key)
+        if path.exists():
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+            self.hits.append(stage)
+            print(f"[cache] {stage}: reusing artifact {key[:12]}")
+            return result
+
+        result = compute()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)  # atomic: a crash never leaves a truncated artifact
+        self.misses.append(stage)
+        return result
+
+    def summary(self):
+        return {'hits': list(self.hits), 'misses': list(self.misses)}
@@ -11,7 +11,25 @@ Original file is located at
 
 """## VISUALIZATION & COMPARISON"""
 
-def plot_comparison_results(baseline_results, improved_results):
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+def _finish_figure(fig, output_path=None):
+    """Show the figure interactively, or save it to `output_path` and release it"""
+    plt.tight_layout()
+    if output_path is None:
+        plt.show()
+        return None
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    fig.savefig(output_path, dpi=120, bbox_inches='tight')
+    plt.close(fig)
+    print(f"Plot saved to {output_path}")
+    return output_path
+
+
+def plot_comparison_results(baseline_results, improved_results, output_path=None):
     """Visualize improvements from baseline to improved model"""
     print("\n" + "=" * 80)
     print("STEP 9: PERFORMANCE COMPARISON & VISUALIZATION")
@@ -87,11 +105,10 @@ def plot_comparison_results(baseline_results, improved_results):
     ax4.legend()
     ax4.grid(axis='y', alpha=0.3)
 
-    plt.tight_layout()
-    plt.show()
+    return _finish_figure(fig, output_path)
 
 
-def plot_hyperparameter_analysis(results_df):
+def plot_hyperparameter_analysis(results_df, output_path=None):
     """Analyze the effect of different hyperparameters"""
     print("\n HYPERPARAMETER ANALYSIS")
     print("=" * 80)
@@ -145,5 +162,53 @@ def plot_hyperparameter_analysis(results_df):
         ax4.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
                 f'{value:.4f}', ha='center', va='bottom')
 
-    plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    return _finish_figure(fig, output_path)
+
+"""## HEADLESS BACKGROUND RENDERING"""
+
+# One plot thread: pyplot's global state is not thread-safe, so headless plots are
+# serialised on it (and nothing else draws while the pipeline runs headless).
+# A thread instead of a forked worker: forking a process that is already running
+# OpenMP/BLAS training threads can deadlock the child.
+_plot_executor = None
+_plot_executor_lock = threading.Lock()
+
+
+def _render_headless(plot_func, args, output_path):
+    plt.switch_backend('Agg')
+    return plot_func(*args, output_path=output_path)
+
+
+def render_plot_in_background(plot_func, *args, output_path):
+    """Render `plot_func(*args)` to `output_path` on the background plot thread (Agg backend).
+
+    Returns a future; pass it to `wait_for_plots` before exiting.
+    """
+    global _plot_executor
+    with _plot_executor_lock:
+        if _plot_executor is None:
+            _plot_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='plot')
+    return _plot_executor.submit(_render_headless, plot_func, args, output_path)
+
+
+def wait_for_plots(futures, timeout=None):
+    """Wait for background plots; returns (failed, timed_out) counts.
+
+    Plots still queued when `timeout` expires are cancelled and reported as
+    timed out, separately from failures; a plot already rendering cannot be
+    interrupted and finishes on the plot thread.
+    """
+    futures = [future for future in futures if future is not None]
+    done, not_done = wait(futures, timeout=timeout)
+    failed = 0
+    for future in done:
+        if future.exception() is not None:
+            failed += 1
+            print(f"  Background plot failed: {future.exception()}")
+    for future in not_done:
+        future.cancel()
+    if failed:
+        print(f"  {failed} background plot(s) failed to render")
+    if not_done:
+        print(f"  {len(not_done)} background plot(s) timed out after {timeout}s")
+    return failed, len(not_done)